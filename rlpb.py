@@ -10,6 +10,15 @@ import calendar
 import os
 import re
 import threading
+import uuid
+import concurrent.futures
+import bisect
+import contextlib
+import functools
+import hashlib
+import itertools
+from collections import Counter
+from operator import itemgetter
 from tkcalendar import DateEntry, Calendar
 from lunarcalendar import Converter, Solar, Lunar
 
@@ -33,11 +42,287 @@ except Exception:
 
 try:
     from openpyxl import Workbook, load_workbook
+    from openpyxl.cell import WriteOnlyCell
     from openpyxl.styles import Font, PatternFill, Alignment
 except ImportError:
-    Workbook, load_workbook, Font, PatternFill, Alignment = None, None, None, None
+    Workbook, load_workbook, WriteOnlyCell, Font, PatternFill, Alignment = (None,) * 6
 except Exception:
-    Workbook, load_workbook, Font, PatternFill, Alignment = None, None, None, None
+    Workbook, load_workbook, WriteOnlyCell, Font, PatternFill, Alignment = (None,) * 6
+
+# 可选：更快的 JSON 编码与解析
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 可选：pandas 的 calamine 引擎依赖，读取 Excel 远快于 openpyxl
+try:
+    import python_calamine
+except ImportError:
+    python_calamine = None
+
+# 编辑请假记录对话框中可选的请假类型
+_LEAVE_TYPES_UI = ("带薪病事假", "年休假", "育儿假", "婚假", "丧假")
+# 导入数据要求的日期格式 YYYY-MM-DD
+_DATE_RE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+# 视为年休假的类型名称
+_ANNUAL_TYPES = frozenset(("年休假", "年假"))
+# 休假日历中常见请假类型的固定颜色
+_LEAVE_TYPE_DEFAULT_COLORS = {
+    '年假': '#4CAF50',      # 绿色
+    '事假': '#FF9800',      # 橙色
+    '病假': '#F44336',      # 红色
+    '育儿假': '#9C27B0',    # 紫色
+    '婚假': '#E91E63',      # 粉色
+    '丧假': '#607D8B',      # 蓝灰色
+    '调休': '#00BCD4',      # 青色
+    '其他': '#9E9E9E'       # 灰色
+}
+# 其他请假类型依次轮流使用的颜色
+_LEAVE_TYPE_CYCLE_COLORS = (
+    '#4CAF50', '#FF9800', '#F44336', '#9C27B0', '#E91E63',
+    '#607D8B', '#00BCD4', '#795548', '#FF5722', '#3F51B5',
+    '#009688', '#CDDC39', '#8BC34A', '#FFC107', '#FFEB3B'
+)
+
+# 请假相关界面的延迟刷新标记，可按位组合
+DIRTY_TREE = 1   # 请假记录列表（同时刷新统计）
+DIRTY_STATS = 2  # 请假统计
+DIRTY_QUOTA = 4  # 年度配额汇总、年份选项与年度显示
+DIRTY_CAL = 8    # 日历视图
+
+# Tcl 端批量插入 Treeview 行：整批数据一次传入，避免逐行的 Python→Tcl 调用
+_TREEVIEW_FILL_PROC = """
+proc ::_treeview_fill {tree rows} {
+    foreach values $rows {
+        $tree insert {} end -values $values
+    }
+}
+proc ::_treeview_fill_items {tree rows} {
+    foreach {iid values} $rows {
+        $tree insert {} end -id $iid -values $values
+    }
+}
+"""
+
+@functools.lru_cache(maxsize=4096)
+def _monthrange(year, month):
+    """calendar.monthrange 的缓存版本：返回 (当月1日星期几, 当月天数)"""
+    return calendar.monthrange(year, month)
+
+@functools.lru_cache(maxsize=256)
+def _contrast_color(bg_color):
+    """根据背景色亮度选择对比文字色（黑色或白色），按颜色值缓存结果"""
+    # 移除#号并转换为RGB
+    bg_color = bg_color.lstrip('#')
+    if len(bg_color) == 3:
+        # 处理简写格式如 #FFF
+        bg_color = ''.join([c*2 for c in bg_color])
+
+    try:
+        r = int(bg_color[0:2], 16)
+        g = int(bg_color[2:4], 16)
+        b = int(bg_color[4:6], 16)
+    except ValueError:
+        return '#000000'  # 默认黑色
+
+    # 计算亮度
+    luminance = (0.299 * r + 0.587 * g + 0.114 * b) / 255
+
+    # 如果背景色较亮，使用黑色文字；否则使用白色文字
+    return '#000000' if luminance > 0.5 else '#FFFFFF'
+
+# 两位日期字符串，下标即日期数字（下标 0 不使用）
+_DAY_STRS = tuple(f"{d:02d}" for d in range(32))
+
+# 排班计划树首次插入的行数与滚动到底部时每次追加的行数
+_SCHEDULE_TREE_INITIAL_ROWS = 200
+_SCHEDULE_TREE_EXTEND_STEP = 100
+# 调班记录列表每批插入的行数
+_SWAP_LIST_CHUNK_ROWS = 200
+
+def _parse_ymd(date_str):
+    """解析请假日期字符串为 (年, 月, 日)
+
+    标准格式 YYYY-MM-DD 走固定位置切片；未补零的旧数据（如 2025-4-1）或带时间后缀的
+    值退回 split 解析。
+
+    Args:
+        date_str: 日期字符串
+
+    Returns:
+        tuple: (年, 月, 日)，格式不符时返回 None
+    """
+    if not isinstance(date_str, str):
+        return None
+    if (len(date_str) == 10 and date_str[4] == '-' and date_str[7] == '-'
+            and date_str[:4].isdigit() and date_str[5:7].isdigit() and date_str[8:].isdigit()):
+        y, m, d = int(date_str[:4]), int(date_str[5:7]), int(date_str[8:])
+    else:
+        parts = date_str.strip().split(' ', 1)[0].split('-')
+        if len(parts) != 3:
+            return None
+        try:
+            y, m, d = int(parts[0]), int(parts[1]), int(parts[2])
+        except ValueError:
+            return None
+    if not (1 <= m <= 12 and 1 <= d <= 31):
+        return None
+    return y, m, d
+
+def _normalize_date_str(date_str):
+    """把可解析的日期统一为补零的 YYYY-MM-DD，无法解析时原样返回"""
+    if isinstance(date_str, str) and _DATE_RE.match(date_str):
+        return date_str
+    parsed = _parse_ymd(date_str)
+    if parsed is None:
+        return date_str
+    return "%04d-%02d-%02d" % parsed
+
+def _leave_record_sort_key(record):
+    """请假记录排序键：按日期、人员升序，保证 leave_records 始终有序
+
+    缺失、None 或非字符串的字段统一转为字符串，避免混合类型比较时 sort 抛出 TypeError。
+    """
+    return (str(record.get("date") or ""), str(record.get("plan_name") or ""))
+
+def _leave_record_key(record):
+    """请假记录身份键：(人员, 日期, 类型)"""
+    return (record.get("plan_name"), record.get("date"), record.get("type"))
+
+def _leave_record_ym(record):
+    """取请假记录的 (年, 月)，日期缺失或不是有效日期时返回 None；休假统计的两条路径共用"""
+    parsed = _parse_ymd(record.get("date"))
+    if parsed is None:
+        return None
+    year, month, day = parsed
+    if day > _monthrange(year, month)[1]:
+        return None
+    return year, month
+
+def _build_shifts_map(start_date, pattern, total_days):
+    """按轮班模式从开始日期起生成 {YYYY-MM-DD: 班次} 映射
+
+    Args:
+        start_date: 开始日期 (datetime.date)
+        pattern: 轮班模式列表，循环使用
+        total_days: 生成的天数
+
+    Returns:
+        dict: 日期字符串到班次名称的映射
+    """
+    ordinal0 = start_date.toordinal()
+    fromordinal = datetime.date.fromordinal
+    keys = [fromordinal(ordinal0 + i).isoformat() for i in range(total_days)]
+    return dict(zip(keys, itertools.islice(itertools.cycle(pattern), total_days)))
+
+@functools.lru_cache(maxsize=128)
+def _expected_shifts_map(start_date, pattern, total_days):
+    """_build_shifts_map 的缓存版本，供 _compact_schedule 使用；返回的字典为共享只读对象
+
+    按 (开始日期, 轮班模式元组, 天数) 缓存：计划的开始日期、模式和范围未变时，
+    每次保存不再在主线程上重新生成整张映射，也无需在排班修改时清除缓存。
+    """
+    return _build_shifts_map(start_date, pattern, total_days)
+
+def _compact_schedule(info):
+    """保存用：去掉可由开始日期和轮班模式推算出的 shifts，只保留与推算结果不同的部分
+
+    调换班等手动修改记录在 shift_overrides / shift_removed 中；差异过多或日期无法解析时原样返回。
+
+    Args:
+        info: 排班计划字典
+
+    Returns:
+        dict: 可直接写入 JSON 的计划字典
+    """
+    shifts = info.get("shifts")
+    pattern = info.get("shift_pattern")
+    if not shifts or not pattern:
+        return info
+    try:
+        start = datetime.datetime.strptime(info.get("start_date", ""), "%Y-%m-%d").date()
+        last = datetime.datetime.strptime(max(shifts), "%Y-%m-%d").date()
+    except (TypeError, ValueError):
+        return info
+    total_days = (last - start).days + 1
+    if total_days <= 0:
+        return info
+    try:
+        base = _expected_shifts_map(start, tuple(pattern), total_days)
+    except TypeError:
+        # 轮班模式含不可哈希的元素时无法缓存，原样保存
+        return info
+    overrides = {d: s for d, s in shifts.items() if base.get(d) != s}
+    removed = [d for d in base if d not in shifts]
+    if len(overrides) + len(removed) >= len(shifts) // 2:
+        return info
+    compact = {k: v for k, v in info.items() if k != "shifts"}
+    compact["shift_days"] = total_days
+    if overrides:
+        compact["shift_overrides"] = overrides
+    if removed:
+        compact["shift_removed"] = removed
+    return compact
+
+def _expand_schedule(info):
+    """加载用：把 _compact_schedule 保存的计划还原为完整的 shifts 映射（原地修改）
+
+    Args:
+        info: 从 JSON 读取的排班计划字典
+
+    Returns:
+        dict: 含完整 shifts 的计划字典
+    """
+    total_days = info.pop("shift_days", None)
+    if total_days is None:
+        return info
+    try:
+        start = datetime.datetime.strptime(info.get("start_date", ""), "%Y-%m-%d").date()
+        shifts = _build_shifts_map(start, info.get("shift_pattern", []), total_days)
+    except (TypeError, ValueError):
+        shifts = {}
+    for d in info.pop("shift_removed", ()):
+        shifts.pop(d, None)
+    shifts.update(info.pop("shift_overrides", {}))
+    info["shifts"] = shifts
+    return info
+
+def _read_leave_table(file_path):
+    """读取待导入的请假记录表格（.csv 或 Excel），需要 pandas
+
+    所有单元格按字符串读取，空单元格为空字符串而不是 NaN。
+
+    Args:
+        file_path: 文件路径
+
+    Returns:
+        DataFrame: 表格内容
+    """
+    options = {"dtype": str, "keep_default_na": False}
+    if file_path.lower().endswith(".csv"):
+        return pd.read_csv(file_path, encoding="utf-8-sig", **options)
+    if python_calamine is not None:
+        try:
+            return pd.read_excel(file_path, engine="calamine", **options)
+        except (ImportError, ValueError):
+            pass  # 旧版 pandas 不支持 calamine 引擎时回退到默认引擎
+    return pd.read_excel(file_path, **options)
+
+def _legacy_swap_id(record):
+    """为缺少 swap_id 的旧调换记录生成稳定 ID
+
+    同一次调换在两个日期下的两份记录内容相同，因此得到相同的 ID，载入时可合并为一条。
+
+    Args:
+        record: 调换记录字典
+
+    Returns:
+        str: 调换记录ID
+    """
+    key = "|".join(str(record.get(field, ""))
+                   for field in ("person_a", "date_a", "person_b", "date_b", "timestamp"))
+    return "legacy_" + hashlib.blake2b(key.encode("utf-8"), digest_size=8).hexdigest()
 
 class _SimpleTooltip:
     """轻量级悬浮提示工具，避免引入额外依赖。
@@ -75,6 +360,120 @@ class _SimpleTooltip:
                 pass
             self.tip = None
 
+class _CalendarCell:
+    """月历中的单个日期格子。
+    控件只创建一次，翻月时通过 configure() 修改文字、颜色并按需显示子标签。
+    子标签带有 CALENDAR_TIP_TAG 绑定标签，悬浮提示文本存放在 tooltip_text 属性中，
+    由 ShiftScheduler 统一处理 <Enter>/<Leave>。
+    """
+    CALENDAR_TIP_TAG = "CalendarCellTip"
+
+    def __init__(self, parent, row, col):
+        self.frame = tk.Frame(parent, relief=tk.RIDGE)
+        self.frame.grid(row=row, column=col, sticky=tk.NSEW, padx=1, pady=1)  # 减少间距
+        self.visible = True
+        self.content = None
+        # "今日"标识
+        self.today_label = tk.Label(self.frame, text="今日", font=("Arial", 8, "bold"),
+                                    fg="#FFFFFF", bg="#0066CC")
+        self.day_label = tk.Label(self.frame)
+        self.holiday_label = tk.Label(self.frame, fg="#FFFFFF")
+        self.shift_label = tk.Label(self.frame)
+        self.leave_label = tk.Label(self.frame, bg="#FF0000", fg="#FFFFFF")
+        # 记录默认字体与前景色，用于从"今日"样式恢复
+        self.default_font = self.day_label.cget("font")
+        self.default_fg = self.day_label.cget("fg")
+        for widget in (self.holiday_label, self.shift_label, self.leave_label):
+            widget.tooltip_text = ""
+            widget.bindtags((self.CALENDAR_TIP_TAG,) + widget.bindtags())
+
+    def _reset(self):
+        """收起所有子标签"""
+        for widget in (self.today_label, self.day_label, self.holiday_label,
+                       self.shift_label, self.leave_label):
+            widget.pack_forget()
+
+    def set_today(self, is_today):
+        """按上次的内容重新配置格子，只改变是否为今天"""
+        day_num, is_weekend, holiday, shift, shift_info, leave = self.content
+        self.configure(day_num, is_today, is_weekend, holiday, shift, shift_info, leave)
+
+    def hide(self):
+        """隐藏格子（月初前、月末后的空位）"""
+        if self.visible:
+            self._reset()
+            self.frame.grid_remove()
+            self.visible = False
+
+    def configure(self, day_num, is_today, is_weekend, holiday, shift, shift_info, leave):
+        """按日期数据设置格子内容
+
+        Args:
+            day_num: 日期数字
+            is_today: 是否为今天
+            is_weekend: 是否为周六日
+            holiday: 节假日名称，不显示时为 None
+            shift: 班次名称
+            shift_info: 班次类型信息，无排班时为 None
+            leave: 请假类型，不显示时为 None
+        """
+        # 记录内容，供跨日时只切换"今日"样式
+        self.content = (day_num, is_weekend, holiday, shift, shift_info, leave)
+        self._reset()
+        # 周末底色（周六日轻微灰蓝，以增强可读性）
+        cell_bg = "#F2F6FC" if is_weekend else "#FFFFFF"
+        font, fg = self.default_font, self.default_fg
+        self.frame.config(borderwidth=2 if is_today else 1,
+                          bg="#E6F3FF" if is_today else cell_bg,
+                          highlightbackground="#0066CC" if is_today else "#CCCCCC",
+                          highlightthickness=2 if is_today else 1)
+        if not self.visible:
+            self.frame.grid()
+            self.visible = True
+
+        # 显示日期 - 今天使用粗体、蓝色文字和特殊背景
+        if is_today:
+            self.day_label.config(text=str(day_num), font=("Arial", 10, "bold"),
+                                  fg="#0066CC", bg="#E6F3FF")
+            self.today_label.pack(anchor=tk.NE, padx=2, pady=1)
+        else:
+            self.day_label.config(text=str(day_num), font=font, fg=fg, bg=cell_bg)
+        self.day_label.pack(anchor=tk.NW, padx=4, pady=2)
+
+        # 标记节假日（重要节假日突出显示）
+        if holiday:
+            if is_today:
+                self.day_label.config(fg="#CC0000", font=("Arial", 10, "bold"))
+                self.holiday_label.config(text=f"今日·{holiday}", font=("Arial", 8, "bold"), bg="#FF4444")
+            else:
+                self.day_label.config(fg="red")
+                self.holiday_label.config(text=holiday, font=font, bg="#FF6666")
+            self.holiday_label.pack(fill=tk.X, padx=2, pady=(2, 2))
+            self.holiday_label.tooltip_text = f"节假日: {holiday}"
+
+        # 显示排班，今天的排班使用更醒目的样式
+        if shift_info:
+            color = shift_info["color"]
+            if is_today:
+                self.shift_label.config(text=shift, bg=color, font=("Arial", 9, "bold"),
+                                        fg=_contrast_color(color))
+            else:
+                self.shift_label.config(text=shift, bg=color, font=font, fg=fg)
+            self.shift_label.pack(fill=tk.BOTH, expand=True, padx=4, pady=4)
+            # 悬浮提示显示班次时间
+            st = shift_info.get("start_time", "")
+            et = shift_info.get("end_time", "")
+            self.shift_label.tooltip_text = f"{shift}  时间: {st} - {et}".strip()
+
+        # 显示请假，今天的请假使用更醒目的样式
+        if leave:
+            if is_today:
+                self.leave_label.config(text=f"今日·{leave}", font=("Arial", 8, "bold"))
+            else:
+                self.leave_label.config(text=leave, font=font)
+            self.leave_label.pack(fill=tk.X, padx=4, pady=(0, 4))
+            self.leave_label.tooltip_text = f"请假: {leave}"
+
 class DataValidator:
     """数据验证器类"""
 
@@ -198,12 +597,17 @@ class ErrorHandler:
         return False
 
 class ShiftScheduler:
+    # 多人日历记录行的右键菜单绑定标签，人员与日期存放在控件的 ctx_member/ctx_date 属性中
+    CONTEXT_MENU_TAG = "MultiCalendarContextMenu"
+
     def __init__(self, root):
         self.root = root
         self.root.title("排班日历专业版 v3.0")
 
         # 绑定窗口关闭事件
         self.root.protocol("WM_DELETE_WINDOW", self._on_window_close)
+        # 所有多人日历记录行共用一个右键菜单事件处理
+        self.root.bind_class(self.CONTEXT_MENU_TAG, "<Button-3>", self._on_context_menu_event)
 
         # 动态计算初始窗口尺寸以适应日历显示
         screen_width = root.winfo_screenwidth()
@@ -249,25 +653,96 @@ class ShiftScheduler:
         }
 
         self.shift_schedules = {}
-        self.swap_records = {}  # 调换班记录: {date_str: [{person_a, person_b, timestamp}]}
+        # 调换班记录: {swap_id: {person_a, person_b, date_a, date_b, ..., timestamp}}
+        self.swaps_by_id = {}
+        # 由 swaps_by_id 派生的索引: {swap_id: (date_str, ...)}、{date_str: [swap_id, ...]}
+        # 与 {(person, date_str): [swap_id, ...]}
+        self._swap_dates = {}
+        self._swaps_by_date = {}
+        self._swap_index = {}
+        # 多人日历数据缓存与日期格子控件缓存
+        self._calendar_data_cache = {}
+        self._multi_calendar_cell_cache = {}
+        # 调班记录列表的分批填充编号，每次刷新递增
+        self._swap_list_fill_id = 0
+        # 多人日历共用的右键菜单及当前操作的 (人员, 日期)
+        self._multi_calendar_menu = None
+        self._context_menu_target = None
         self.current_schedule = None
         self.current_plan_name = None
         self.current_date = datetime.date.today()
         # 配额年份选择变量
         # 配额年份变量
-        current_date = datetime.date.today()
+        # 当前年休假年度缓存: (计算时的日期, 年度)，日期变化后重新计算
+        self._cached_leave_year = None
         # 根据年休假规则设置默认年份：4-12月用当年，1-3月用去年
-        if current_date.month >= 4:
-            default_leave_year = current_date.year
-        else:
-            default_leave_year = current_date.year - 1
-        self.quota_year_var = tk.StringVar(value=str(default_leave_year))
+        self.quota_year_var = tk.StringVar(value=str(self._current_leave_year()))
         # 请假数据
         self.leave_types = ["事假", "病假"]
         # 记录项: {"plan_name": str, "date": "YYYY-MM-DD", "type": str, "note": str}
         self.leave_records = []
         # 年度配额: {plan_name: {year: {type: quota_int}}}
         self.leave_quotas = {}
+        # 注册批量插入 Treeview 的 Tcl 过程
+        self.root.tk.eval(_TREEVIEW_FILL_PROC)
+        # 对话框下拉选项缓存：人员名称与请假年份，数据变更时置空
+        self._plan_names_cache = None
+        self._leave_years_cache = None
+        self._quota_years_cache = None
+        # 按整数年份缓存的节假日子字典引用，见 _get_year_holidays
+        self._holidays_by_year = {}
+        # 是否已安排空闲时同步年/月下拉
+        self._year_month_sync_pending = False
+        # 请假页人员下拉框当前的选项，未变化时跳过重新配置
+        self._last_leave_plan_names = ()
+        # 日历用请假索引: {(plan_name, date): type}，按需构建
+        self._leave_index = None
+        # 当月休假日历用索引: {(year, month): [(day, record)]}，按需构建
+        self._leave_by_ym = None
+        # 休假统计用的请假记录 DataFrame 镜像（需要 pandas），按需构建
+        self._leave_df = None
+        # 当月休假日历的成员、请假类型排序结果及请假类型颜色映射缓存
+        self._members_cache = None
+        self._leave_types_cache = None
+        self._color_mapping_cache = None
+        # 请假记录索引: {(plan_name, date, type): [record, ...]}，允许重复记录
+        self._record_index = {}
+        # 班次类型树的行映射：{名称: iid} 与 {名称: values}，用于增量更新
+        self._shift_type_tree_owner = None
+        self._shift_type_iids = {}
+        self._shift_type_rows = {}
+        # 排班计划树尚未插入的人员名称（按需分批插入）
+        self._schedule_tree_remaining = []
+        self._schedule_tree_extend_pending = False
+        # 月历格子：首次显示时创建，之后翻月复用
+        self._calendar_cells_owner = None
+        self._calendar_cells = []
+        self._calendar_person_label = None
+        # 日历格子共用的悬浮提示窗口
+        self._calendar_tip = None
+        self._calendar_tip_label = None
+        # 月历当前显示的 (年, 月)、渲染时的"今天"及 {日期数字: 格子}，供跨日时局部更新
+        self._calendar_shown = None
+        self._calendar_today = None
+        self._calendar_day_cells = {}
+        # 是否有已调度但尚未执行的延迟保存
+        self._save_pending = False
+        # 后台写盘：待写入的最新 (序号, JSON 快照)、写盘线程及保护二者的锁
+        self._save_lock = threading.Lock()
+        self._save_seq = 0
+        self._save_payload = None
+        self._save_thread = None
+        # 串行化实际写文件操作，并记录已写入的最新快照序号
+        self._write_lock = threading.Lock()
+        self._written_seq = 0
+        # 上次写入内容的摘要，内容未变化时跳过写盘
+        self._last_save_digest = None
+        # 后台写盘线程最近一次失败的异常，由主线程取出后提示
+        self._save_error = None
+        # Excel 导入导出等耗时文件读写的后台线程池
+        self._io_pool = concurrent.futures.ThreadPoolExecutor(max_workers=2)
+        # 待刷新的请假界面标记（DIRTY_* 按位组合），在空闲时统一刷新
+        self._ui_dirty = 0
         # 节假日复制粘贴临时存储
         self._holidays_clipboard = None  # {"year": str, "data": {"MM-DD": "名称"}}
 
@@ -305,6 +780,8 @@ class ShiftScheduler:
         # 加载数据后应用字体设置
         self.setup_modern_styles()
         self._data_loaded = True
+        # 跨日时刷新日历中的"今日"高亮
+        self.root.after(60000, self._tick_today)
 
     def setup_modern_styles(self):
         """设置现代化样式 - 支持亮色/暗色主题"""
@@ -915,7 +1392,7 @@ class ShiftScheduler:
             self.update_all_widgets_theme()
 
             # 保存主题设置
-            self.save_data()
+            self._schedule_save()
 
             # 更新状态栏
             theme_name = "亮色调" if theme == "light" else "暗色调"
@@ -1276,7 +1753,7 @@ class ShiftScheduler:
                             count += 1
                     elif record_year == current_date.year and record_month == month:
                         # 非年休假的其他假期，按自然年统计
-                        if not self._is_annual_leave(r.get('type', '')):
+                        if r.get('type', '') not in _ANNUAL_TYPES:
                             count += 1
                 except Exception:
                     continue
@@ -2286,18 +2763,25 @@ class ShiftScheduler:
 
             # 恢复数据
             self.shift_types = backup_data['shift_types']
-            self.shift_schedules = backup_data['schedules']
+            # 备份文件可能是压缩保存的格式，需还原完整的 shifts
+            self.shift_schedules = {name: _expand_schedule(info)
+                                    for name, info in backup_data['schedules'].items()}
+            self._invalidate_plan_cache()
             self.leave_types = backup_data['leave_types']
+            self._invalidate_leave_type_cache()
             self.leave_records = backup_data['leave_records']
+            self._reindex_leave_records()
             self.leave_quotas = backup_data['leave_quotas']
             self.holidays = backup_data['holidays']
+            self._holidays_by_year.clear()
 
             # 保存恢复后的数据
-            self.save_data()
+            self._schedule_save()
 
             # 更新界面
             self.update_shift_type_tree()
             self.update_schedule_tree()
+            self.update_leave_plan_combo()
             self.update_leave_tree()
             self.update_holiday_tree()
             self.update_calendar()
@@ -2461,10 +2945,14 @@ class ShiftScheduler:
 
                     # 合并或替换排班计划
                     if include_vars.get('schedules', tk.BooleanVar()).get() and 'schedules' in import_data:
+                        # 导入文件可能是压缩保存的格式（如 shift_data.json），需还原完整的 shifts
+                        imported_schedules = {name: _expand_schedule(info)
+                                              for name, info in import_data['schedules'].items()}
                         if mode == "replace":
-                            self.shift_schedules = import_data['schedules']
+                            self.shift_schedules = imported_schedules
                         else:  # merge
-                            self.shift_schedules.update(import_data['schedules'])
+                            self.shift_schedules.update(imported_schedules)
+                        self._invalidate_plan_cache()
 
                     # 合并或替换请假类型
                     if include_vars.get('leave_types', tk.BooleanVar()).get() and 'leave_types' in import_data:
@@ -2474,6 +2962,7 @@ class ShiftScheduler:
                             for item in import_data['leave_types']:
                                 if item not in self.leave_types:
                                     self.leave_types.append(item)
+                        self._invalidate_leave_type_cache()
 
                     # 合并或替换请假记录
                     if include_vars.get('leave_records', tk.BooleanVar()).get() and 'leave_records' in import_data:
@@ -2481,6 +2970,7 @@ class ShiftScheduler:
                             self.leave_records = import_data['leave_records']
                         else:  # merge
                             self.leave_records.extend(import_data['leave_records'])
+                        self._reindex_leave_records()
 
                     # 合并或替换年度配额
                     if include_vars.get('leave_quotas', tk.BooleanVar()).get() and 'leave_quotas' in import_data:
@@ -2496,6 +2986,7 @@ class ShiftScheduler:
                     if include_vars.get('holidays', tk.BooleanVar()).get() and 'holidays' in import_data:
                         if mode == "replace":
                             self.holidays = import_data['holidays']
+                            self._holidays_by_year.clear()
                         else:  # merge
                             for year, holidays in import_data['holidays'].items():
                                 if year not in self.holidays:
@@ -2503,11 +2994,12 @@ class ShiftScheduler:
                                 self.holidays[year].update(holidays)
 
                     # 保存导入后的数据
-                    self.save_data()
+                    self._schedule_save()
 
                     # 更新界面
                     self.update_shift_type_tree()
                     self.update_schedule_tree()
+                    self.update_leave_plan_combo()
                     self.update_leave_tree()
                     self.update_holiday_tree()
                     self.update_calendar()
@@ -2853,7 +3345,7 @@ class ShiftScheduler:
 
         def apply_font_settings():
             """应用字体设置"""
-            self.save_data()  # 保存字体设置
+            self._schedule_save()  # 保存字体设置
             self.setup_modern_styles()  # 重新配置样式
             self.update_status("字体设置已应用并保存")
             messagebox.showinfo("成功", "字体设置已应用并保存！\n部分界面元素需重启应用才能完全生效")
@@ -2881,7 +3373,7 @@ class ShiftScheduler:
                 update_preview()
 
                 # 直接保存和应用字体设置（不需要用户再点应用按钮）
-                self.save_data()  # 保存字体设置
+                self._schedule_save()  # 保存字体设置
                 self.setup_modern_styles()  # 重新配置样式
 
                 # 反馈
@@ -2935,10 +3427,9 @@ class ShiftScheduler:
 
         def apply_multi_cal_settings():
             """应用多人日历设置"""
-            self.save_data()
+            self._schedule_save()
             # 清除多人日历缓存，强制重新渲染
-            if hasattr(self, '_multi_calendar_cell_cache'):
-                self._multi_calendar_cell_cache.clear()
+            self._multi_calendar_cell_cache.clear()
             # 清除标题相关标志，确保标题能够重新创建
             if hasattr(self, '_header_widgets'):
                 delattr(self, '_header_widgets')
@@ -2958,10 +3449,9 @@ class ShiftScheduler:
                 self.multi_calendar_font_size.set(9)
                 mc_size_spin.delete(0, tk.END)
                 mc_size_spin.insert(0, "9")
-                self.save_data()
+                self._schedule_save()
                 # 清除多人日历缓存，强制重新渲染
-                if hasattr(self, '_multi_calendar_cell_cache'):
-                    self._multi_calendar_cell_cache.clear()
+                self._multi_calendar_cell_cache.clear()
                 # 清除标题相关标志，确保标题能够重新创建
                 if hasattr(self, '_header_widgets'):
                     delattr(self, '_header_widgets')
@@ -3025,7 +3515,7 @@ Enter     - 编辑选中项目"""
 
     def _on_tray_setting_changed(self):
         """托盘设置更改时的回调"""
-        self.save_data()
+        self._schedule_save()
         if self.minimize_to_tray.get():
             self.update_status("已启用最小化到托盘功能")
         else:
@@ -3204,6 +3694,7 @@ Enter     - 编辑选中项目
         """刷新所有数据"""
         self.update_shift_type_tree()
         self.update_schedule_tree()
+        self.update_leave_plan_combo()
         self.update_leave_tree()
         self.update_holiday_tree()
         self.update_calendar()
@@ -3366,7 +3857,7 @@ Enter     - 编辑选中项目
             }
 
             self.update_shift_type_tree()
-            self.save_data()
+            self._schedule_save()
             self.update_status(f"已粘贴班次: {new_name}")
         else:
             messagebox.showwarning("提示", "请先复制一个班次类型")
@@ -3432,8 +3923,9 @@ Enter     - 编辑选中项目
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
 
         # 排班计划列表
+        self._schedule_tree_scrollbar = scrollbar
         self.schedule_tree = ttk.Treeview(tree_frame, columns=("name", "pattern", "start_date"),
-                                        show="headings", yscrollcommand=scrollbar.set)
+                                        show="headings", yscrollcommand=self._on_schedule_tree_yscroll)
         self.schedule_tree.heading("name", text="人员名称")
         self.schedule_tree.heading("pattern", text="轮班模式")
         self.schedule_tree.heading("start_date", text="开始日期")
@@ -3510,9 +4002,11 @@ Enter     - 编辑选中项目
                 'start_date': self.copied_schedule['start_date'],
                 'shifts': {}
             }
+            self._invalidate_plan_cache()
 
             self.update_schedule_tree()
-            self.save_data()
+            self.update_leave_plan_combo()
+            self._schedule_save()
             self.update_status(f"已粘贴排班计划: {new_name}")
         else:
             messagebox.showwarning("提示", "请先复制一个排班计划")
@@ -3520,6 +4014,8 @@ Enter     - 编辑选中项目
     def filter_schedules(self):
         """过滤排班计划"""
         search_term = self.schedule_search_var.get().lower()
+        # 搜索需覆盖全部人员，先补齐尚未插入的行
+        self._extend_schedule_tree()
         for item in self.schedule_tree.get_children():
             values = self.schedule_tree.item(item)['values']
             if search_term in values[0].lower():
@@ -3986,10 +4482,8 @@ Enter     - 编辑选中项目
     def update_multi_calendar(self):
         """更新多人日历显示"""
         # 清除缓存以确保显示最新数据
-        if hasattr(self, '_calendar_data_cache'):
-            self._calendar_data_cache.clear()
-        if hasattr(self, '_multi_calendar_cell_cache'):
-            self._multi_calendar_cell_cache.clear()
+        self._calendar_data_cache.clear()
+        self._multi_calendar_cell_cache.clear()
 
         try:
             # 获取当前选择的年月
@@ -4077,7 +4571,7 @@ Enter     - 编辑选中项目
 
             # 获取月份第一天和最后一天
             first_day = datetime.date(year, month, 1)
-            days_in_month = calendar.monthrange(year, month)[1]
+            days_in_month = _monthrange(year, month)[1]
 
             # 计算第一周的起始位置 (周一为0)
             start_weekday = first_day.weekday()
@@ -4089,9 +4583,6 @@ Enter     - 编辑选中项目
             filtered_data = self._filter_multi_calendar_data(calendar_data, shift_filter)
 
             # 性能优化：缓存和复用日期格子控件
-            if not hasattr(self, '_multi_calendar_cell_cache'):
-                self._multi_calendar_cell_cache = {}
-
             # 生成缓存键（包含字体大小，确保字体变化时重新渲染）
             font_size = self.multi_calendar_font_size.get()
             cache_key = f"{year}_{month}_{shift_filter}_{font_size}"
@@ -4170,9 +4661,6 @@ Enter     - 编辑选中项目
     def get_multi_member_calendar_data(self, year, month):
         """获取指定年月的多人排班数据 - 性能优化版本"""
         # 性能优化：添加数据缓存
-        if not hasattr(self, '_calendar_data_cache'):
-            self._calendar_data_cache = {}
-
         cache_key = f"multi_{year}_{month}"
 
         # 检查缓存是否存在且数据未变化
@@ -4186,7 +4674,7 @@ Enter     - 编辑选中项目
         calendar_data = {}
 
         # 获取指定月份的天数
-        days_in_month = calendar.monthrange(year, month)[1]
+        days_in_month = _monthrange(year, month)[1]
 
         # 初始化每一天的数据
         for day in range(1, days_in_month + 1):
@@ -4325,24 +4813,7 @@ Enter     - 编辑选中项目
 
     def _get_contrast_color(self, bg_color):
         """根据背景色选择对比色（黑色或白色）"""
-        # 移除#号并转换为RGB
-        bg_color = bg_color.lstrip('#')
-        if len(bg_color) == 3:
-            # 处理简写格式如 #FFF
-            bg_color = ''.join([c*2 for c in bg_color])
-
-        try:
-            r = int(bg_color[0:2], 16)
-            g = int(bg_color[2:4], 16)
-            b = int(bg_color[4:6], 16)
-        except ValueError:
-            return '#000000'  # 默认黑色
-
-        # 计算亮度
-        luminance = (0.299 * r + 0.587 * g + 0.114 * b) / 255
-
-        # 如果背景色较亮，使用黑色文字；否则使用白色文字
-        return '#000000' if luminance > 0.5 else '#FFFFFF'
+        return _contrast_color(bg_color)
 
     def _create_multi_calendar_cell(self, parent, row, col, year, month, day, shift_records, today):
         """创建多人日历的单个日期格子 - 现代卡片风格"""
@@ -4450,10 +4921,10 @@ Enter     - 编辑选中项目
 
         # 显示排班记录（最多显示4条）
         display_records = sorted_shift_records[:4]
+        current_date_str = f"{year}-{month:02d}-{day:02d}"
+        # 当天没有任何调换记录时，各条排班都不必再查询调换索引
+        has_swaps = current_date_str in self._swaps_by_date
         for i, record in enumerate(display_records):
-            # 检查该成员在这一天是否有休假
-            current_date_str = f"{year}-{month:02d}-{day:02d}"
-
             # 创建单条排班记录的容器
             record_frame = tk.Frame(shift_frame, bg=bg_color)
             record_frame.pack(fill=tk.X, pady=(2, 0))
@@ -4487,7 +4958,7 @@ Enter     - 编辑选中项目
             name_label.pack(side=tk.LEFT)
 
             # 如果有调换班记录，显示"调"字标签（只检查该班次是否被调换）
-            if self.check_swap_record(record['member'], current_date_str, record['shift']):
+            if has_swaps and self.check_swap_record(record['member'], current_date_str, record['shift']):
                 swap_badge = tk.Frame(record_frame, bg=self.colors['warning'])
                 swap_badge.pack(side=tk.LEFT, padx=(4, 0))
 
@@ -4694,7 +5165,7 @@ Enter     - 编辑选中项目
             month = int(self.multi_month_var.get())
 
             # 获取月份天数
-            days_in_month = calendar.monthrange(year, month)[1]
+            days_in_month = _monthrange(year, month)[1]
 
             # 读取模板文件
             template_path = os.path.join(os.path.dirname(__file__), '运行一部外协员工2025年11月考勤.xls')
@@ -5046,7 +5517,7 @@ Enter     - 编辑选中项目
 
         # 获取月份第一天和最后一天
         first_day = datetime.date(year, month, 1)
-        days_in_month = calendar.monthrange(year, month)[1]
+        days_in_month = _monthrange(year, month)[1]
 
         # 计算第一周的起始位置 (周一为0)
         start_weekday = first_day.weekday()
@@ -5401,6 +5872,9 @@ Enter     - 编辑选中项目
             return
         try:
             y = self.current_date.year
+            # 下拉已显示当前年份时无需再读取选项列表
+            if self.year_var.get() == str(y):
+                return
             values = list(self.year_combo["values"]) if self.year_combo["values"] else []
             values = [int(v) for v in values] if values else []
             if y not in values:
@@ -5432,10 +5906,24 @@ Enter     - 编辑选中项目
         if not hasattr(self, 'month_combo'):
             return
         try:
-            self.month_var.set(str(self.current_date.month))
+            month_str = str(self.current_date.month)
+            if self.month_var.get() != month_str:
+                self.month_var.set(month_str)
         except Exception:
             pass
 
+    def _sync_year_month(self):
+        """翻月后同步年份与月份下拉；连续翻月时合并为一次空闲时同步"""
+        if not self._year_month_sync_pending:
+            self._year_month_sync_pending = True
+            self.root.after_idle(self._do_sync_year_month)
+
+    def _do_sync_year_month(self):
+        """执行 _sync_year_month 安排的同步"""
+        self._year_month_sync_pending = False
+        self.sync_year_combo()
+        self.sync_month_combo()
+
     def setup_leave_tab(self):
         """请假管理标签页"""
         frame = ttk.Frame(self.notebook)
@@ -5460,6 +5948,7 @@ Enter     - 编辑选中项目
         plan_names = list(self.shift_schedules.keys())
         self.leave_plan_var = tk.StringVar(value=plan_names[0] if plan_names else "")
         self.leave_plan_combo = ttk.Combobox(right, textvariable=self.leave_plan_var, values=plan_names, state="readonly")
+        self._last_leave_plan_names = tuple(plan_names)
         self.leave_plan_combo.grid(row=0, column=1, sticky=tk.W)
 
         ttk.Label(right, text="请假日期").grid(row=0, column=2, sticky=tk.W, padx=(50, 0))
@@ -5830,7 +6319,7 @@ Enter     - 编辑选中项目
                 self.holidays.setdefault(y, {})[md] = nm
                 added_count += 1
 
-            self.save_data()
+            self._schedule_save()
             self.update_holiday_tree()
             self.update_calendar()
             self.update_status(f"已添加节日: {nm} ({added_count}个日期)")
@@ -5903,7 +6392,7 @@ Enter     - 编辑选中项目
             md_norm = f"{int(mm_i):02d}-{int(dd_i):02d}"
             self.holidays.setdefault(year, {})[md_norm] = new_name
 
-            self.save_data()
+            self._schedule_save()
             self.update_holiday_tree()
             self.update_calendar()
             self.update_status(f"已更新节日: {year}-{md_norm} {new_name}")
@@ -5975,7 +6464,7 @@ Enter     - 编辑选中项目
 
         # 保存数据并更新界面
         if deleted_count > 0:
-            self.save_data()
+            self._schedule_save()
             self.update_holiday_tree()
             self.update_calendar()
 
@@ -6038,12 +6527,13 @@ Enter     - 编辑选中项目
             copied = self._holidays_clipboard.get("data", {})
             if mode_var.get() == "overwrite":
                 self.holidays[ty] = dict(copied)
+                self._holidays_by_year.pop(int(ty), None)
             else:
                 dest = self.holidays.setdefault(ty, {})
                 for md, nm in copied.items():
                     if md not in dest:
                         dest[md] = nm
-            self.save_data()
+            self._schedule_save()
             # 若当前节假日页显示目标年，则刷新
             if hasattr(self, 'holiday_year_var') and self.holiday_year_var.get() == ty:
                 self.update_holiday_tree()
@@ -6074,7 +6564,7 @@ Enter     - 编辑选中项目
             solar_date = self.lunar_to_solar(year_num, lunar_month, lunar_day)
             md = f"{solar_date.month:02d}-{solar_date.day:02d}"
             self.holidays.setdefault(year, {})[md] = name
-            self.save_data()
+            self._schedule_save()
             self.update_holiday_tree()
             self.update_calendar()
             self.update_status(f"已添加农历节日: {year}年{lunar_month}月{lunar_day}日 ({md}) {name}")
@@ -6090,6 +6580,7 @@ Enter     - 编辑选中项目
             ys = str(y)
             # 清空当前年份的节假日
             self.holidays[ys] = {}
+            self._holidays_by_year.pop(y, None)
 
             # 公历节日
             self.holidays[ys].setdefault("01-01", "元旦")
@@ -6166,7 +6657,7 @@ Enter     - 编辑选中项目
             # 冬至（公历12月21日或22日）
             self.holidays[ys].setdefault("12-21", "冬至")
 
-        self.save_data()
+        self._schedule_save()
         self.update_holiday_tree()
         self.update_calendar()
         self.update_status(f"已填充法定节假日（{start_year}-{end_year}），包含农历节日")
@@ -6226,7 +6717,7 @@ Enter     - 编辑选中项目
                             md = f"{mm}-{dd}"
                             self.holidays.setdefault(yyyy, {})[md] = name
                             total_added += 1
-            self.save_data()
+            self._schedule_save()
             self.update_holiday_tree()
             self.update_calendar()
             self.update_status(f"已从权威源获取完成，新增/更新 {total_added} 条")
@@ -6256,6 +6747,7 @@ Enter     - 编辑选中项目
                 messagebox.showwarning("警告", "类型已存在")
                 return
             self.leave_types.append(val)
+            self._invalidate_leave_type_cache()
             self.update_leave_type_list()
             # 更新类型下拉
             self.leave_type_combo["values"] = self.leave_types
@@ -6269,7 +6761,7 @@ Enter     - 编辑选中项目
                     self.leave_type_combo.current(idx)
                 except Exception:
                     pass
-            self.save_data()
+            self._schedule_save()
             top.destroy()
 
         top = tk.Toplevel(self.root)
@@ -6292,6 +6784,7 @@ Enter     - 编辑选中项目
                 self.leave_types.remove(val)
             except ValueError:
                 pass
+            self._invalidate_leave_type_cache()
             self.update_leave_type_list()
             # 同步下拉
             self.leave_type_combo["values"] = self.leave_types
@@ -6305,7 +6798,199 @@ Enter     - 编辑选中项目
                         pass
                 else:
                     self.leave_type_var.set("")
-            self.save_data()
+            self._schedule_save()
+
+    def _insert_leave_record(self, record):
+        """按日期顺序插入请假记录，保持 leave_records 有序"""
+        bisect.insort(self.leave_records, record, key=_leave_record_sort_key)
+        self._record_index.setdefault(_leave_record_key(record), []).append(record)
+        self._invalidate_leave_caches()
+
+    def _remove_leave_record(self, record):
+        """按对象身份移除单条请假记录，同步更新索引"""
+        records = self.leave_records
+        i = bisect.bisect_left(records, _leave_record_sort_key(record), key=_leave_record_sort_key)
+        while i < len(records) and records[i] is not record:
+            i += 1
+        if i < len(records):
+            del records[i]
+        key = _leave_record_key(record)
+        bucket = self._record_index.get(key, [])
+        for j, rec in enumerate(bucket):
+            if rec is record:
+                del bucket[j]
+                break
+        if not bucket:
+            self._record_index.pop(key, None)
+        self._invalidate_leave_caches()
+
+    def _reindex_leave_records(self):
+        """整体替换或批量追加 leave_records 后重新排序并重建索引
+
+        未补零的旧日期（如 2025-4-1）在此统一为 YYYY-MM-DD，后续按固定位置切片的代码无需再兼容。
+        """
+        for rec in self.leave_records:
+            date_str = rec.get("date")
+            if date_str and not (isinstance(date_str, str) and _DATE_RE.match(date_str)):
+                rec["date"] = _normalize_date_str(date_str)
+        self.leave_records.sort(key=_leave_record_sort_key)
+        self._record_index = {}
+        for rec in self.leave_records:
+            self._record_index.setdefault(_leave_record_key(rec), []).append(rec)
+        self._invalidate_leave_caches()
+
+    def _invalidate_leave_caches(self):
+        """leave_records 变更后清除依赖它的缓存"""
+        self._leave_years_cache = None
+        self._quota_years_cache = None
+        self._leave_index = None
+        self._leave_by_ym = None
+        self._leave_df = None
+        # 成员与请假类型列表同时来自请假记录
+        self._members_cache = None
+        self._leave_types_cache = None
+        self._color_mapping_cache = None
+
+    def _invalidate_plan_cache(self):
+        """shift_schedules 增删或替换后清除人员名称缓存"""
+        self._plan_names_cache = None
+        self._members_cache = None
+
+    def _invalidate_leave_type_cache(self):
+        """leave_types 增删或替换后清除依赖它的缓存"""
+        self._leave_types_cache = None
+        self._color_mapping_cache = None
+
+    def _get_plan_names(self):
+        """返回人员名称元组（按添加顺序），供下拉框直接使用"""
+        if self._plan_names_cache is None:
+            self._plan_names_cache = tuple(self.shift_schedules)
+        return self._plan_names_cache
+
+    def _get_leave_by_ym(self):
+        """返回按 (年, 月) 分组的请假记录索引 {(year, month): [(day, record), ...]}
+
+        日期无法解析的记录不进入索引；leave_records 变更后由 _invalidate_leave_caches 清除。
+        """
+        if self._leave_by_ym is None:
+            index = {}
+            for record in self.leave_records:
+                # 规范的 YYYY-MM-DD 按固定位置切片，未补零的旧数据退回 split 解析
+                parsed = _parse_ymd(record.get('date'))
+                if parsed is None:
+                    continue
+                year, month, day = parsed
+                if not 1 <= day <= _monthrange(year, month)[1]:
+                    continue
+                index.setdefault((year, month), []).append((day, record))
+            self._leave_by_ym = index
+        return self._leave_by_ym
+
+    def _get_leave_df(self):
+        """返回请假记录的 pandas DataFrame 镜像（plan_name、type、year、month 列），按需构建
+
+        行顺序与 leave_records 一致，日期解析与 _leave_record_ym 相同，无效日期的记录不包含在内；
+        缺少人员或类型字段时取 "未知"，与无 pandas 时的逐条统计一致。需要 pandas 可用。
+        """
+        if self._leave_df is None:
+            plan_names, types, years, months = [], [], [], []
+            for r in self.leave_records:
+                ym = _leave_record_ym(r)
+                if ym is None:
+                    continue
+                plan_names.append(r.get('plan_name', '未知'))
+                types.append(r.get('type', '未知'))
+                years.append(ym[0])
+                months.append(ym[1])
+            self._leave_df = pd.DataFrame({
+                'plan_name': pd.Series(plan_names, dtype=object),
+                'type': pd.Series(types, dtype=object),
+                'year': pd.Series(years, dtype='int64'),
+                'month': pd.Series(months, dtype='int64'),
+            })
+        return self._leave_df
+
+    def _get_year_holidays(self, year):
+        """按整数年份取当年节假日字典，缓存 {年份: self.holidays 中的子字典} 引用
+
+        只缓存已存在的年份；整体替换 holidays 或某年子字典时需清除对应缓存。
+
+        Args:
+            year: 年份 (int)
+
+        Returns:
+            dict: {"MM-DD": 节假日名称}，无数据时为空字典
+        """
+        year_holidays = self._holidays_by_year.get(year)
+        if year_holidays is None:
+            year_holidays = self.holidays.get(str(year))
+            if year_holidays is None:
+                return {}
+            self._holidays_by_year[year] = year_holidays
+        return year_holidays
+
+    def _get_leave_index(self):
+        """返回 {(plan_name, date): type} 索引，供日历按格子 O(1) 查找请假
+
+        同一人员同一天有多条记录时保留列表中的第一条，与逐条扫描的结果一致。
+        """
+        if self._leave_index is None:
+            index = {}
+            for rec in self.leave_records:
+                index.setdefault((rec.get("plan_name"), rec.get("date")), rec.get("type", "请假"))
+            self._leave_index = index
+        return self._leave_index
+
+    def _get_leave_year_options(self):
+        """返回请假记录年份选项（"全部" + 年份倒序），供查询对话框使用"""
+        if self._leave_years_cache is None:
+            years = {rec.get('date', '')[:4] for rec in self.leave_records if rec.get('date')}
+            self._leave_years_cache = ("全部",) + tuple(sorted(years, reverse=True))
+        return self._leave_years_cache
+
+    def _get_leave_quota_years(self):
+        """返回请假记录涉及的配额年份集合（年休假 1-3 月归上一年），按需构建"""
+        if self._quota_years_cache is None:
+            years = set()
+            for rec in self.leave_records:
+                # 标准日期走固定位置切片，未补零的旧数据退回 split 解析
+                parsed = _parse_ymd(rec.get("date", ""))
+                if parsed is None:
+                    continue
+                record_year, record_month, _ = parsed
+                # 年休假：4-12月属于当年配额，1-3月属于上年配额；其他类型使用自然年
+                # （逐条记录直接查模块级年休假类型集合，省去方法调用）
+                if record_month < 4 and rec.get("type", "") in _ANNUAL_TYPES:
+                    record_year -= 1
+                years.add(record_year)
+            self._quota_years_cache = frozenset(years)
+        return self._quota_years_cache
+
+    def _mark_ui_dirty(self, flags):
+        """标记需要刷新的请假界面，并在空闲时统一刷新一次
+
+        Args:
+            flags: DIRTY_* 标记的按位组合
+        """
+        if not self._ui_dirty:
+            self.root.after_idle(self._flush_ui)
+        self._ui_dirty |= flags
+
+    def _flush_ui(self):
+        """执行已标记的界面刷新，每个刷新方法只调用一次"""
+        self._report_save_error()
+        dirty, self._ui_dirty = self._ui_dirty, 0
+        if dirty & DIRTY_TREE:
+            # update_leave_tree 内部会同步刷新统计
+            self.update_leave_tree()
+        elif dirty & DIRTY_STATS:
+            self.update_leave_stats()
+        if dirty & DIRTY_QUOTA:
+            self.update_quota_summary()
+            self.update_quota_year_options()  # 更新年份选项
+            self.update_current_leave_year_display()  # 更新年份显示
+        if dirty & DIRTY_CAL:
+            self.update_calendar()
 
     def update_leave_tree(self):
         if not hasattr(self, 'leave_tree'):
@@ -6467,9 +7152,18 @@ Enter     - 编辑选中项目
         if current_year not in year_options:
             self.leave_stats_year_var.set("全部")
 
+    def _current_leave_year(self):
+        """返回今天所属的年休假年度：4-12月为当年，1-3月为上一年（按日缓存）"""
+        today = datetime.date.today()
+        cached = self._cached_leave_year
+        if cached is None or cached[0] != today:
+            leave_year = today.year if today.month >= 4 else today.year - 1
+            cached = self._cached_leave_year = (today, leave_year)
+        return cached[1]
+
     def _is_annual_leave(self, leave_type):
         """判断是否为年休假类型"""
-        return leave_type in ["年休假", "年假"]
+        return leave_type in _ANNUAL_TYPES
 
     def _calculate_annual_leave_usage(self, plan, year):
         """计算指定人员指定年份的年休假使用情况
@@ -6497,7 +7191,7 @@ Enter     - 编辑选中项目
         for rec in self.leave_records:
             if rec.get("plan_name") != plan:
                 continue
-            if not self._is_annual_leave(rec.get("type", "")):
+            if rec.get("type", "") not in _ANNUAL_TYPES:
                 continue
             date_str = rec.get("date", "")
             if not date_str:
@@ -6512,19 +7206,18 @@ Enter     - 编辑选中项目
         next_year_q1_dates = []  # 次年1-3月
 
         for date_str in annual_leave_dates:
-            try:
-                parts = date_str.split('-')
-                d_year = int(parts[0])
-                d_month = int(parts[1])
-
-                if d_year == year and d_month >= 4:
-                    # 当年4-12月
-                    current_year_dates.append(date_str)
-                elif d_year == year + 1 and d_month <= 3:
-                    # 次年1-3月
-                    next_year_q1_dates.append(date_str)
-            except Exception:
+            # 格式不符的记录直接跳过
+            parsed = _parse_ymd(date_str)
+            if parsed is None:
                 continue
+            d_year, d_month, _ = parsed
+
+            if d_year == year and d_month >= 4:
+                # 当年4-12月
+                current_year_dates.append(date_str)
+            elif d_year == year + 1 and d_month <= 3:
+                # 次年1-3月
+                next_year_q1_dates.append(date_str)
 
         # 计算使用量
         # 1. 当年4-12月的全部计入当年配额
@@ -6563,18 +7256,14 @@ Enter     - 编辑选中项目
         for rec in self.leave_records:
             if rec.get("plan_name") != plan:
                 continue
-            if not self._is_annual_leave(rec.get("type", "")):
+            if rec.get("type", "") not in _ANNUAL_TYPES:
                 continue
-            date_str = rec.get("date", "")
-            try:
-                parts = date_str.split('-')
-                d_year = int(parts[0])
-                d_month = int(parts[1])
-                # 只统计上一年4-12月的使用
-                if d_year == last_year and d_month >= 4:
-                    last_year_used += 1
-            except Exception:
+            parsed = _parse_ymd(rec.get("date", ""))
+            if parsed is None:
                 continue
+            # 只统计上一年4-12月的使用
+            if parsed[0] == last_year and parsed[1] >= 4:
+                last_year_used += 1
 
         # 上一年的剩余配额
         last_year_remaining = max(0, last_year_quota - last_year_used)
@@ -6584,17 +7273,13 @@ Enter     - 编辑选中项目
         for rec in self.leave_records:
             if rec.get("plan_name") != plan:
                 continue
-            if not self._is_annual_leave(rec.get("type", "")):
+            if rec.get("type", "") not in _ANNUAL_TYPES:
                 continue
-            date_str = rec.get("date", "")
-            try:
-                parts = date_str.split('-')
-                d_year = int(parts[0])
-                d_month = int(parts[1])
-                if d_year == year and d_month >= 1 and d_month <= 3:
-                    current_year_q1_count += 1
-            except Exception:
+            parsed = _parse_ymd(rec.get("date", ""))
+            if parsed is None:
                 continue
+            if parsed[0] == year and 1 <= parsed[1] <= 3:
+                current_year_q1_count += 1
 
         # 当年1-3月从当年配额扣除的天数 = 总数 - 从上一年扣除的天数
         used_from_current_year = max(0, current_year_q1_count - last_year_remaining)
@@ -6627,12 +7312,10 @@ Enter     - 编辑选中项目
         Returns:
             int: 剩余配额天数
         """
-        try:
-            date_parts = date_str.split('-')
-            year = int(date_parts[0])
-            month = int(date_parts[1])
-        except Exception:
+        parsed = _parse_ymd(date_str)
+        if parsed is None:
             return 0
+        year, month, _ = parsed
 
         # 根据请假类型确定配额年份
         if self._is_annual_leave(leave_type):
@@ -6675,18 +7358,15 @@ Enter     - 编辑选中项目
                     for rec in self.leave_records:
                         if exclude_record and rec == exclude_record:
                             continue
-                        if rec.get("plan_name") == plan and self._is_annual_leave(rec.get("type", "")):
-                            rec_date_str = rec.get("date", "")
-                            try:
-                                rec_parts = rec_date_str.split('-')
-                                rec_year = int(rec_parts[0])
-                                rec_month = int(rec_parts[1])
-                                # 只统计当年1-3月使用上一年配额后，继续使用当年配额的部分
-                                if rec_year == year and rec_month >= 1 and rec_month <= 3:
-                                    # 这部分需要减去上一年剩余配额后才是使用当年配额的
-                                    pass  # 先不计算，使用简化逻辑
-                            except Exception:
+                        if rec.get("plan_name") == plan and rec.get("type", "") in _ANNUAL_TYPES:
+                            parsed = _parse_ymd(rec.get("date", ""))
+                            if parsed is None:
                                 continue
+                            rec_year, rec_month, _ = parsed
+                            # 只统计当年1-3月使用上一年配额后，继续使用当年配额的部分
+                            if rec_year == year and rec_month >= 1 and rec_month <= 3:
+                                # 这部分需要减去上一年剩余配额后才是使用当年配额的
+                                pass  # 先不计算，使用简化逻辑
 
                     # 返回当年配额的剩余（这里简化处理，假设当年1-3月没有用过当年配额）
                     return current_year_quota
@@ -6701,13 +7381,9 @@ Enter     - 编辑选中项目
                     continue
 
                 if rec.get("plan_name") == plan and rec.get("type") == leave_type:
-                    rec_date_str = rec.get("date", "")
-                    try:
-                        rec_year = int(rec_date_str.split('-')[0])
-                        if rec_year == quota_year:
-                            used_days += 1
-                    except Exception:
-                        continue
+                    parsed = _parse_ymd(rec.get("date", ""))
+                    if parsed is not None and parsed[0] == quota_year:
+                        used_days += 1
 
         # 返回剩余配额（不允许负数）
         return max(0, quota - used_days)
@@ -6860,6 +7536,9 @@ Enter     - 编辑选中项目
             "陪产假": "陪产",
             "丧假": "丧"
         }
+        short_by_type = {t: type_short_names.get(t, t) for t in types}
+        # 本次汇总内按人员缓存年休假已用天数
+        annual_used_cache = {}
 
         for plan in plans:
             # 计算该人员所有请假类型的剩余天数总和
@@ -6869,36 +7548,39 @@ Enter     - 编辑选中项目
             remain_summary = [] # 用于显示剩余汇总信息
 
             for ltype in types:
-                is_annual = self._is_annual_leave(ltype)
-
                 # 获取原始配额（总是显示实际设置的配额）
                 quota = self.leave_quotas.get(plan, {}).get(str(year), {}).get(ltype, 0)
+                # 未设置配额的类型既不显示也不影响剩余总数，跳过使用量计算
+                if quota <= 0:
+                    continue
+
+                is_annual = self._is_annual_leave(ltype)
 
                 # 计算已使用天数（总是显示实际使用情况）
                 if is_annual:
-                    # 年休假使用特殊计算方法
-                    # 查看当年时：需要包含当年1-3月从当年配额扣除的部分
-                    # 查看历史年时：使用原有逻辑
-                    if year == current_year:
-                        # 当前年份：包含1-3月从当年配额扣除的部分
-                        used_days_from_q1 = self._calculate_current_year_annual_leave_usage(plan, year)
-                        # 计算4-12月的使用（如果有的话）
-                        used_days_from_rest = 0
-                        for rec in self.leave_records:
-                            if rec.get("plan_name") == plan and self._is_annual_leave(rec.get("type", "")):
-                                rec_date_str = rec.get("date", "")
-                                try:
-                                    parts = rec_date_str.split('-')
-                                    d_year = int(parts[0])
-                                    d_month = int(parts[1])
-                                    if d_year == year and d_month >= 4:
+                    # 年休假使用量只与人员和年份有关，同一人员的多个年休假类型共用结果
+                    used_days = annual_used_cache.get(plan)
+                    if used_days is None:
+                        # 年休假使用特殊计算方法
+                        # 查看当年时：需要包含当年1-3月从当年配额扣除的部分
+                        # 查看历史年时：使用原有逻辑
+                        if year == current_year:
+                            # 当前年份：包含1-3月从当年配额扣除的部分
+                            used_days_from_q1 = self._calculate_current_year_annual_leave_usage(plan, year)
+                            # 计算4-12月的使用（如果有的话）
+                            used_days_from_rest = 0
+                            for rec in self.leave_records:
+                                if rec.get("plan_name") == plan and rec.get("type", "") in _ANNUAL_TYPES:
+                                    parsed = _parse_ymd(rec.get("date", ""))
+                                    if parsed is None:
+                                        continue
+                                    if parsed[0] == year and parsed[1] >= 4:
                                         used_days_from_rest += 1
-                                except Exception:
-                                    continue
-                        used_days = used_days_from_q1 + used_days_from_rest
-                    else:
-                        # 历史年份：使用原有逻辑
-                        used_days = self._calculate_annual_leave_usage(plan, year)
+                            used_days = used_days_from_q1 + used_days_from_rest
+                        else:
+                            # 历史年份：使用原有逻辑
+                            used_days = self._calculate_annual_leave_usage(plan, year)
+                        annual_used_cache[plan] = used_days
                 else:
                     # 其他假期类型使用自然年统计
                     used_days = len(used_map_normal.get((plan, ltype), set()))
@@ -6916,12 +7598,10 @@ Enter     - 编辑选中项目
                     total_remain += remain
 
                 # 构建汇总信息（使用简化名称）
-                # 只要配额大于0（即设置过配额），就显示该类型
-                if quota > 0:
-                    short_type = type_short_names.get(ltype, ltype)
-                    quota_summary.append(f"{short_type}:{quota}")
-                    used_summary.append(f"{short_type}:{used_days}")
-                    remain_summary.append(f"{short_type}:{remain}")
+                short_type = short_by_type[ltype]
+                quota_summary.append(f"{short_type}:{quota}")
+                used_summary.append(f"{short_type}:{used_days}")
+                remain_summary.append(f"{short_type}:{remain}")
 
             # 每个人员只显示一行，包含剩余总数
             quota_str = "，".join(quota_summary) if quota_summary else "无配额"
@@ -6980,14 +7660,9 @@ Enter     - 编辑选中项目
                 return
 
         # 使用实际分配的请假类型添加记录
-        self.leave_records.append({"plan_name": plan, "date": date_str, "type": allocated_type, "note": note})
-        self.update_leave_tree()
-        self.update_leave_stats()
-        self.update_quota_summary()
-        self.update_quota_year_options()  # 更新年份选项
-        self.update_current_leave_year_display()  # 更新年份显示
-        self.save_data()
-        self.update_calendar()
+        self._insert_leave_record({"plan_name": plan, "date": date_str, "type": allocated_type, "note": note})
+        self._mark_ui_dirty(DIRTY_TREE | DIRTY_QUOTA | DIRTY_CAL)
+        self._schedule_save()
         self.update_status(f"已添加请假记录: {plan} {date_str} {allocated_type}")
 
         # 构建成功消息
@@ -7031,22 +7706,16 @@ Enter     - 编辑选中项目
             confirm_msg = f"确定删除选中的 {count} 条记录吗？"
 
         if messagebox.askyesno("确认", confirm_msg):
-            # 删除所有选中的记录
-            for rec in records_to_delete:
-                self.leave_records = [r for r in self.leave_records if not (
-                    r.get("plan_name") == rec["plan_name"] and
-                    r.get("date") == rec["date"] and
-                    r.get("type") == rec["type"]
-                )]
+            # 删除所有选中的记录（同一人员、日期、类型的记录一并删除）
+            keys = {_leave_record_key(rec) for rec in records_to_delete}
+            self.leave_records = [r for r in self.leave_records if _leave_record_key(r) not in keys]
+            for key in keys:
+                self._record_index.pop(key, None)
+            self._invalidate_leave_caches()
 
             # 更新界面
-            self.update_leave_tree()
-            self.update_leave_stats()
-            self.update_quota_summary()
-            self.update_quota_year_options()  # 更新年份选项
-            self.update_current_leave_year_display()  # 更新年份显示
-            self.save_data()
-            self.update_calendar()
+            self._mark_ui_dirty(DIRTY_TREE | DIRTY_QUOTA | DIRTY_CAL)
+            self._schedule_save()
 
             if count == 1:
                 self.update_status("已删除请假记录")
@@ -7073,13 +7742,7 @@ Enter     - 编辑选中项目
         plan, date_str, ltype = vals[0], vals[1], vals[2]
 
         # 查找要编辑的记录
-        target_record = None
-        for record in self.leave_records:
-            if (record.get("plan_name") == plan and
-                record.get("date") == date_str and
-                record.get("type") == ltype):
-                target_record = record
-                break
+        target_record = self._record_index.get((plan, date_str, ltype), [None])[0]
 
         if not target_record:
             messagebox.showerror("错误", "找不到要编辑的记录")
@@ -7107,7 +7770,7 @@ Enter     - 编辑选中项目
         ttk.Label(main_frame, text="人员名称:").grid(row=0, column=0, sticky=tk.W, pady=5)
         plan_var = tk.StringVar(value=target_record.get("plan_name", ""))
         plan_combo = ttk.Combobox(main_frame, textvariable=plan_var, width=25, state="readonly")
-        plan_combo['values'] = list(self.shift_schedules.keys())
+        plan_combo['values'] = self._get_plan_names()
         plan_combo.grid(row=0, column=1, sticky=tk.W, pady=5, padx=(5, 0))
 
         # 请假日期
@@ -7120,7 +7783,7 @@ Enter     - 编辑选中项目
         ttk.Label(main_frame, text="请假类型:").grid(row=2, column=0, sticky=tk.W, pady=5)
         type_var = tk.StringVar(value=target_record.get("type", ""))
         type_combo = ttk.Combobox(main_frame, textvariable=type_var, width=25, state="readonly")
-        type_combo['values'] = ["带薪病事假", "年休假", "育儿假", "婚假", "丧假"]
+        type_combo['values'] = _LEAVE_TYPES_UI
         type_combo.grid(row=2, column=1, sticky=tk.W, pady=5, padx=(5, 0))
 
         # 备注
@@ -7157,9 +7820,9 @@ Enter     - 编辑选中项目
                 return
 
             try:
-                # 验证日期格式
+                # 验证日期格式，并统一为补零的 YYYY-MM-DD，保证按位置解析年月有效
                 from datetime import datetime
-                datetime.strptime(new_date, '%Y-%m-%d')
+                new_date = datetime.strptime(new_date, '%Y-%m-%d').strftime('%Y-%m-%d')
             except ValueError:
                 messagebox.showwarning("警告", "日期格式不正确，请使用 YYYY-MM-DD 格式")
                 return
@@ -7184,22 +7847,19 @@ Enter     - 编辑选中项目
                 if not confirm:
                     return
 
-            # 更新记录（使用实际分配的请假类型）
+            # 更新记录（使用实际分配的请假类型），重新插入以保持日期顺序
+            self._remove_leave_record(target_record)
             target_record.update({
                 "plan_name": new_plan,
                 "date": new_date,
                 "type": allocated_type,
                 "note": new_note
             })
+            self._insert_leave_record(target_record)
 
             # 刷新界面
-            self.update_leave_tree()
-            self.update_leave_stats()
-            self.update_quota_summary()
-            self.update_quota_year_options()  # 更新年份选项
-            self.update_current_leave_year_display()  # 更新年份显示
-            self.save_data()
-            self.update_calendar()
+            self._mark_ui_dirty(DIRTY_TREE | DIRTY_QUOTA | DIRTY_CAL)
+            self._schedule_save()
             self.update_status(f"已修改请假记录: {new_plan} {new_date} {allocated_type}")
 
             edit_window.destroy()
@@ -7244,7 +7904,7 @@ Enter     - 编辑选中项目
         ttk.Label(query_frame, text="选择人员:").grid(row=0, column=0, sticky=tk.W, pady=5)
         person_var = tk.StringVar()
         person_combo = ttk.Combobox(query_frame, textvariable=person_var, width=25, state="readonly")
-        person_combo['values'] = list(self.shift_schedules.keys())
+        person_combo['values'] = self._get_plan_names()
         if person_combo['values']:
             person_combo.current(0)
         person_combo.grid(row=0, column=1, sticky=tk.W, pady=5, padx=(5, 0))
@@ -7253,17 +7913,7 @@ Enter     - 编辑选中项目
         ttk.Label(query_frame, text="年份（可选）:").grid(row=0, column=2, sticky=tk.W, pady=5, padx=(20, 0))
         year_var = tk.StringVar(value="全部")
         year_combo = ttk.Combobox(query_frame, textvariable=year_var, width=15, state="readonly")
-        # 获取所有请假记录中的年份
-        years = set()
-        for rec in self.leave_records:
-            date_str = rec.get('date', '')
-            if date_str:
-                try:
-                    year = date_str.split('-')[0]
-                    years.add(year)
-                except:
-                    pass
-        year_combo['values'] = ["全部"] + sorted(list(years), reverse=True)
+        year_combo['values'] = self._get_leave_year_options()
         year_combo.grid(row=0, column=3, sticky=tk.W, pady=5, padx=(5, 0))
 
         # 查询按钮
@@ -7276,34 +7926,32 @@ Enter     - 编辑选中项目
             selected_year = year_var.get()
 
             # 清空结果树
-            for item in result_tree.get_children():
-                result_tree.delete(item)
+            result_tree.delete(*result_tree.get_children())
 
-            # 过滤记录
+            # 过滤记录（leave_records 按日期升序，倒序遍历即最新的在前）
+            # 循环内使用局部别名，减少属性查找
+            recs = self.leave_records
+            _get = dict.get
             filtered_records = []
-            for rec in self.leave_records:
-                if rec.get("plan_name") == person:
-                    if selected_year == "全部":
-                        filtered_records.append(rec)
-                    else:
-                        date_str = rec.get('date', '')
-                        if date_str.startswith(selected_year):
-                            filtered_records.append(rec)
-
-            # 按日期排序（最新的在前）
-            filtered_records.sort(key=lambda r: r.get('date', ''), reverse=True)
+            append = filtered_records.append
+            if selected_year == "全部":
+                for rec in reversed(recs):
+                    if _get(rec, "plan_name") == person:
+                        append(rec)
+            else:
+                for rec in reversed(recs):
+                    if _get(rec, "plan_name") == person and _get(rec, "date", "").startswith(selected_year):
+                        append(rec)
 
             # 显示结果
             if not filtered_records:
                 messagebox.showinfo("查询结果", f"未找到 {person} 的请假记录")
                 return
 
-            for rec in filtered_records:
-                result_tree.insert("", tk.END, values=(
-                    rec.get("date", ""),
-                    rec.get("type", ""),
-                    rec.get("note", "")
-                ))
+            self._treeview_fill(result_tree, [
+                (rec.get("date", ""), rec.get("type", ""), rec.get("note", ""))
+                for rec in filtered_records
+            ])
 
             # 更新统计信息
             total_days = len(filtered_records)
@@ -7378,24 +8026,14 @@ Enter     - 编辑选中项目
         ttk.Label(filter_frame, text="年份:").grid(row=0, column=0, sticky=tk.W, pady=5)
         year_var = tk.StringVar(value="全部")
         year_combo = ttk.Combobox(filter_frame, textvariable=year_var, width=15, state="readonly")
-        # 获取所有请假记录中的年份
-        years = set()
-        for rec in self.leave_records:
-            date_str = rec.get('date', '')
-            if date_str:
-                try:
-                    year = date_str.split('-')[0]
-                    years.add(year)
-                except:
-                    pass
-        year_combo['values'] = ["全部"] + sorted(list(years), reverse=True)
+        year_combo['values'] = self._get_leave_year_options()
         year_combo.grid(row=0, column=1, sticky=tk.W, pady=5, padx=(5, 0))
 
         # 人员筛选
         ttk.Label(filter_frame, text="人员:").grid(row=0, column=2, sticky=tk.W, pady=5, padx=(20, 0))
         person_var = tk.StringVar(value="全部")
         person_combo = ttk.Combobox(filter_frame, textvariable=person_var, width=20, state="readonly")
-        person_combo['values'] = ["全部"] + list(self.shift_schedules.keys())
+        person_combo['values'] = ("全部",) + self._get_plan_names()
         person_combo.grid(row=0, column=3, sticky=tk.W, pady=5, padx=(5, 0))
 
         # 类型筛选
@@ -7405,6 +8043,32 @@ Enter     - 编辑选中项目
         type_combo['values'] = ["全部"] + self.leave_types
         type_combo.grid(row=0, column=5, sticky=tk.W, pady=5, padx=(5, 0))
 
+        # 结果分页渲染状态：只插入可见区域附近的行，滚动接近底部时再追加
+        initial_rows = 200
+        extend_step = 100
+        render_state = {"records": [], "shown": 0, "pending": False}
+
+        def extend_rows(count):
+            render_state["pending"] = False
+            records = render_state["records"]
+            start = render_state["shown"]
+            end = min(start + count, len(records))
+            if start >= end:
+                return
+            self._treeview_fill(result_tree, [
+                (rec.get("plan_name", ""), rec.get("date", ""), rec.get("type", ""), rec.get("note", ""))
+                for rec in records[start:end]
+            ])
+            render_state["shown"] = end
+
+        def on_tree_yscroll(first, last):
+            scrollbar_y.set(first, last)
+            # 滚动到接近底部且仍有未插入的记录时，空闲时追加下一批
+            if (float(last) >= 0.95 and not render_state["pending"]
+                    and render_state["shown"] < len(render_state["records"])):
+                render_state["pending"] = True
+                result_tree.after_idle(extend_rows, extend_step)
+
         # 应用筛选按钮
         def apply_filter():
             selected_year = year_var.get()
@@ -7412,32 +8076,26 @@ Enter     - 编辑选中项目
             selected_type = type_var.get()
 
             # 清空结果树
-            for item in result_tree.get_children():
-                result_tree.delete(item)
-
-            # 过滤记录
+            result_tree.delete(*result_tree.get_children())
+
+            # 过滤记录：筛选条件在循环外组合成单个判断函数
+            match = self._build_leave_record_filter(selected_year, selected_person, selected_type)
+            # leave_records 按日期升序，倒序遍历即最新的在前；统计在同一遍中完成
+            # 循环内使用局部别名，减少属性查找
+            recs = self.leave_records
+            _get = dict.get
             filtered_records = []
-            for rec in self.leave_records:
-                # 年份筛选
-                if selected_year != "全部":
-                    date_str = rec.get('date', '')
-                    if not date_str.startswith(selected_year):
-                        continue
-
-                # 人员筛选
-                if selected_person != "全部":
-                    if rec.get("plan_name") != selected_person:
-                        continue
-
-                # 类型筛选
-                if selected_type != "全部":
-                    if rec.get("type") != selected_type:
-                        continue
-
-                filtered_records.append(rec)
-
-            # 按日期排序（最新的在前）
-            filtered_records.sort(key=lambda r: (r.get('date', ''), r.get('plan_name', '')), reverse=True)
+            append = filtered_records.append
+            person_stats = Counter()
+            type_stats = Counter()
+            for rec in reversed(recs):
+                if match(rec):
+                    append(rec)
+                    person_stats[_get(rec, "plan_name", "")] += 1
+                    type_stats[_get(rec, "type", "")] += 1
+
+            render_state["records"] = filtered_records
+            render_state["shown"] = 0
 
             # 显示结果
             if not filtered_records:
@@ -7445,24 +8103,10 @@ Enter     - 编辑选中项目
                 stats_label.config(text="未找到符合条件的记录")
                 return
 
-            for rec in filtered_records:
-                result_tree.insert("", tk.END, values=(
-                    rec.get("plan_name", ""),
-                    rec.get("date", ""),
-                    rec.get("type", ""),
-                    rec.get("note", "")
-                ))
+            extend_rows(initial_rows)
 
             # 更新统计信息
             total_days = len(filtered_records)
-            person_stats = {}
-            type_stats = {}
-            for rec in filtered_records:
-                person = rec.get("plan_name", "")
-                ltype = rec.get("type", "")
-                person_stats[person] = person_stats.get(person, 0) + 1
-                type_stats[ltype] = type_stats.get(ltype, 0) + 1
-
             stats_text = f"共 {total_days} 条记录"
             if person_stats:
                 stats_text += f"，涉及 {len(person_stats)} 人"
@@ -7489,7 +8133,7 @@ Enter     - 编辑选中项目
 
         result_tree = ttk.Treeview(tree_frame, columns=("person", "date", "type", "note"),
                                    show="headings",
-                                   yscrollcommand=scrollbar_y.set,
+                                   yscrollcommand=on_tree_yscroll,
                                    xscrollcommand=scrollbar_x.set)
         result_tree.heading("person", text="人员名称")
         result_tree.heading("date", text="请假日期")
@@ -7516,13 +8160,83 @@ Enter     - 编辑选中项目
         # 初始加载所有记录
         apply_filter()
 
+    def _treeview_fill(self, tree, rows):
+        """在 Treeview 根节点末尾批量追加行，整批只进行一次 Tcl 调用
+
+        Args:
+            tree: ttk.Treeview 控件
+            rows: 每行 values 元组组成的序列
+        """
+        if rows:
+            tree.tk.call("::_treeview_fill", str(tree), tuple(rows))
+
+    def _build_leave_record_filter(self, selected_year, selected_person, selected_type):
+        """根据筛选条件构建请假记录判断函数
+
+        只为非"全部"的条件生成检查，循环内无需再判断筛选值。
+
+        Args:
+            selected_year: 年份字符串或"全部"
+            selected_person: 人员名称或"全部"
+            selected_type: 请假类型或"全部"
+
+        Returns:
+            callable: 接收记录字典，返回是否匹配
+        """
+        checks = []
+        if selected_person != "全部":
+            checks.append(lambda r: r.get("plan_name") == selected_person)
+        if selected_year != "全部":
+            checks.append(lambda r: r.get("date", "").startswith(selected_year))
+        if selected_type != "全部":
+            checks.append(lambda r: r.get("type") == selected_type)
+
+        if not checks:
+            return lambda r: True
+        if len(checks) == 1:
+            return checks[0]
+        if len(checks) == 2:
+            first, second = checks
+            return lambda r: first(r) and second(r)
+        first, second, third = checks
+        return lambda r: first(r) and second(r) and third(r)
+
     # 班次类型管理方法
     def update_shift_type_tree(self):
-        """更新班次类型树视图"""
-        self.shift_type_tree.delete(*self.shift_type_tree.get_children())
-        for name, info in self.shift_types.items():
-            self.shift_type_tree.insert("", tk.END, values=(
-                name, info["start_time"], info["end_time"], info["color"]))
+        """更新班次类型树视图
+
+        与上次显示的内容比较，只删除、插入或修改有变化的行。
+        """
+        tree = self.shift_type_tree
+        if self._shift_type_tree_owner is not tree:
+            # 首次调用或控件被重建：清空后全量插入
+            self._shift_type_tree_owner = tree
+            self._shift_type_iids = {}
+            self._shift_type_rows = {}
+            tree.delete(*tree.get_children())
+
+        iids = self._shift_type_iids
+        rows = self._shift_type_rows
+        desired = self.shift_types
+
+        for name in [n for n in iids if n not in desired]:
+            tree.delete(iids.pop(name))
+            rows.pop(name, None)
+
+        for name, info in desired.items():
+            values = (name, info["start_time"], info["end_time"], info["color"])
+            iid = iids.get(name)
+            if iid is None:
+                iids[name] = tree.insert("", tk.END, values=values)
+            elif rows[name] != values:
+                tree.item(iid, values=values)
+            rows[name] = values
+
+        # 整体替换数据（如加载、导入）后顺序可能不同，按 shift_types 顺序调整
+        if list(iids) != list(desired):
+            for index, name in enumerate(desired):
+                tree.move(iids[name], "", index)
+            self._shift_type_iids = {name: iids[name] for name in desired}
     
     def add_shift_type(self):
         """添加班次类型"""
@@ -7605,7 +8319,7 @@ Enter     - 编辑选中项目
                 "color": color
             }
             self.update_shift_type_tree()
-            self.save_data()
+            self._schedule_save()
             self.update_status(f"已添加班次: {name}")
             dialog.destroy()
 
@@ -7692,7 +8406,7 @@ Enter     - 编辑选中项目
                 "color": color
             }
             self.update_shift_type_tree()
-            self.save_data()
+            self._schedule_save()
             self.update_status(f"已更新班次: {name} -> {new_name}")
             dialog.destroy()
 
@@ -7717,22 +8431,75 @@ Enter     - 编辑选中项目
         if messagebox.askyesno("确认", f"确定要删除班次 '{name}' 吗？"):
             del self.shift_types[name]
             self.update_shift_type_tree()
-            self.save_data()
+            self._schedule_save()
             self.update_status(f"已删除班次: {name}")
     
     # 排班计划管理方法
+    @contextlib.contextmanager
+    def _unpacked(self, widget):
+        """在 with 块内暂时将控件从 pack 布局中摘下，结束后按原选项和位置放回
+
+        批量增删子控件或行时可避免每次修改都触发几何重算与重绘。
+        """
+        pack_info = widget.pack_info() if widget.winfo_manager() == 'pack' else None
+        if pack_info:
+            siblings = widget.master.pack_slaves()
+            idx = siblings.index(widget)
+            if idx + 1 < len(siblings):
+                pack_info['before'] = siblings[idx + 1]
+            widget.pack_forget()
+        try:
+            yield widget
+        finally:
+            if pack_info:
+                widget.pack(**pack_info)
+
     def update_schedule_tree(self):
-        """更新排班计划树视图"""
-        self.schedule_tree.delete(*self.schedule_tree.get_children())
-        for name, info in self.shift_schedules.items():
+        """更新排班计划树视图
+
+        人员较多时只先插入前 _SCHEDULE_TREE_INITIAL_ROWS 行，其余在滚动接近底部时追加。
+        """
+        tree = self.schedule_tree
+        self._schedule_tree_remaining = list(self.shift_schedules)
+        with self._unpacked(tree):
+            tree.delete(*tree.get_children())
+            self._extend_schedule_tree(_SCHEDULE_TREE_INITIAL_ROWS)
+
+    def _extend_schedule_tree(self, count=None):
+        """向排班计划树追加尚未插入的行
+
+        Args:
+            count: 追加的行数，None 表示全部
+        """
+        self._schedule_tree_extend_pending = False
+        remaining = self._schedule_tree_remaining
+        if not remaining:
+            return
+        if count is None:
+            count = len(remaining)
+        batch = remaining[:count]
+        del remaining[:count]
         # 使用人员名称作为iid，确保后续通过选择项可稳定取回名称
-            self.schedule_tree.insert("", tk.END, iid=str(name), values=(
-                name, 
-                " / ".join(info["shift_pattern"]),  # 用斜杠显示更清晰
-                info["start_date"]
-            ))
-        # 同步请假页计划下拉
-        self.update_leave_plan_combo()
+        items = []
+        for name in batch:
+            info = self.shift_schedules.get(name)
+            if info is None:
+                continue
+            items.append(str(name))
+            items.append((name,
+                          " / ".join(info["shift_pattern"]),  # 用斜杠显示更清晰
+                          info["start_date"]))
+        if items:
+            tree = self.schedule_tree
+            tree.tk.call("::_treeview_fill_items", str(tree), tuple(items))
+
+    def _on_schedule_tree_yscroll(self, first, last):
+        """排班计划树滚动回调：同步滚动条，接近底部时在空闲时追加下一批行"""
+        self._schedule_tree_scrollbar.set(first, last)
+        if (float(last) >= 0.95 and self._schedule_tree_remaining
+                and not self._schedule_tree_extend_pending):
+            self._schedule_tree_extend_pending = True
+            self.schedule_tree.after_idle(self._extend_schedule_tree, _SCHEDULE_TREE_EXTEND_STEP)
 
     
     def create_schedule(self):
@@ -7747,8 +8514,7 @@ Enter     - 编辑选中项目
         form.grid(row=0, column=0, sticky=tk.NSEW)
 
         ttk.Label(form, text="人员名称").grid(row=0, column=0, sticky=tk.W, pady=5)
-        name_var = tk.StringVar()
-        name_entry = ttk.Entry(form, textvariable=name_var, width=30)
+        name_entry = ttk.Entry(form, width=30)
         name_entry.grid(row=0, column=1, sticky=tk.W)
 
         ttk.Label(form, text="开始日期").grid(row=1, column=0, sticky=tk.W, pady=5)
@@ -7765,8 +8531,8 @@ Enter     - 编辑选中项目
         available_frame.grid(row=3, column=0, sticky=tk.NSEW)
         available_list = tk.Listbox(available_frame, height=8, exportselection=False)
         available_list.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        for shift_name in self.shift_types.keys():
-            available_list.insert(tk.END, shift_name)
+        if self.shift_types:
+            available_list.insert(tk.END, *self.shift_types)
         avail_scroll = ttk.Scrollbar(available_frame, command=available_list.yview)
         avail_scroll.pack(side=tk.RIGHT, fill=tk.Y)
         available_list.config(yscrollcommand=avail_scroll.set)
@@ -7779,43 +8545,50 @@ Enter     - 编辑选中项目
         pattern_scroll = ttk.Scrollbar(pattern_frame, command=pattern_list.yview)
         pattern_scroll.pack(side=tk.RIGHT, fill=tk.Y)
         pattern_list.config(yscrollcommand=pattern_scroll.set)
+        # 轮班模式的数据模型，列表框只负责显示
+        pattern_items = []
 
         # 中间操作按钮
         btns = ttk.Frame(form)
         btns.grid(row=3, column=2, padx=10)
 
+        def refresh_pattern(select=None):
+            # 以 pattern_items 为准整体重建列表，只需一次删除和一次插入
+            pattern_list.delete(0, tk.END)
+            if pattern_items:
+                pattern_list.insert(tk.END, *pattern_items)
+            if select is not None:
+                pattern_list.selection_set(select)
+
         def add_to_pattern():
             sel = available_list.curselection()
             if not sel:
                 return
-            value = available_list.get(sel[0])
-            pattern_list.insert(tk.END, value)
+            pattern_items.append(available_list.get(sel[0]))
+            refresh_pattern()
 
         def remove_from_pattern():
             sel = pattern_list.curselection()
             if not sel:
                 return
-            pattern_list.delete(sel[0])
+            del pattern_items[sel[0]]
+            refresh_pattern()
 
         def move_up():
             sel = pattern_list.curselection()
             if not sel or sel[0] == 0:
                 return
             idx = sel[0]
-            value = pattern_list.get(idx)
-            pattern_list.delete(idx)
-            pattern_list.insert(idx - 1, value)
-            pattern_list.selection_set(idx - 1)
+            pattern_items[idx - 1], pattern_items[idx] = pattern_items[idx], pattern_items[idx - 1]
+            refresh_pattern(idx - 1)
 
         def move_down():
             sel = pattern_list.curselection()
-            if not sel or sel[0] == pattern_list.size() - 1:
+            if not sel or sel[0] == len(pattern_items) - 1:
                 return
             idx = sel[0]
-            value = pattern_list.get(idx)
-            pattern_list.delete(idx)
-            pattern_list.insert(idx + 1, value)
-            pattern_list.selection_set(idx + 1)
+            pattern_items[idx + 1], pattern_items[idx] = pattern_items[idx], pattern_items[idx + 1]
+            refresh_pattern(idx + 1)
 
         ttk.Button(btns, text=">>", command=add_to_pattern).grid(row=0, column=0, pady=2)
         ttk.Button(btns, text="<<", command=remove_from_pattern).grid(row=1, column=0, pady=2)
@@ -7827,14 +8600,14 @@ Enter     - 编辑选中项目
         action.grid(row=1, column=0, sticky=tk.EW)
 
         def on_save():
-            name = name_var.get().strip()
+            name = name_entry.get().strip()
             if not name:
                 messagebox.showwarning("警告", "请输入人员名称")
                 return
             if name in self.shift_schedules:
                 messagebox.showwarning("警告", "该人员名称已存在")
                 return
-            pattern = [pattern_list.get(i) for i in range(pattern_list.size())]
+            pattern = list(pattern_items)
             if not pattern:
                 messagebox.showwarning("警告", "请至少添加一个班次到轮班模式")
                 return
@@ -7843,9 +8616,10 @@ Enter     - 编辑选中项目
                 "start_date": start_date.get_date().strftime('%Y-%m-%d')
             }
             self.shift_schedules[name] = info
+            self._invalidate_plan_cache()
             self.update_schedule_tree()
             self.update_leave_plan_combo()
-            self.save_data()
+            self._schedule_save()
             self.update_status(f"已创建人员: {name}")
             dialog.destroy()
 
@@ -7882,8 +8656,8 @@ Enter     - 编辑选中项目
         form.grid(row=0, column=0, sticky=tk.NSEW)
 
         ttk.Label(form, text="人员名称").grid(row=0, column=0, sticky=tk.W, pady=5)
-        name_var = tk.StringVar(value=name)
-        name_entry = ttk.Entry(form, textvariable=name_var, width=30)
+        name_entry = ttk.Entry(form, width=30)
+        name_entry.insert(0, name)
         name_entry.grid(row=0, column=1, sticky=tk.W)
 
         ttk.Label(form, text="开始日期").grid(row=1, column=0, sticky=tk.W, pady=5)
@@ -7901,8 +8675,8 @@ Enter     - 编辑选中项目
         available_frame.grid(row=3, column=0, sticky=tk.NSEW)
         available_list = tk.Listbox(available_frame, height=8, exportselection=False)
         available_list.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        for shift_name in self.shift_types.keys():
-            available_list.insert(tk.END, shift_name)
+        if self.shift_types:
+            available_list.insert(tk.END, *self.shift_types)
         avail_scroll = ttk.Scrollbar(available_frame, command=available_list.yview)
         avail_scroll.pack(side=tk.RIGHT, fill=tk.Y)
         available_list.config(yscrollcommand=avail_scroll.set)
@@ -7914,44 +8688,51 @@ Enter     - 编辑选中项目
         pattern_scroll = ttk.Scrollbar(pattern_frame, command=pattern_list.yview)
         pattern_scroll.pack(side=tk.RIGHT, fill=tk.Y)
         pattern_list.config(yscrollcommand=pattern_scroll.set)
-        for s in info.get("shift_pattern", []):
-            pattern_list.insert(tk.END, s)
+        # 轮班模式的数据模型，列表框只负责显示
+        pattern_items = list(info.get("shift_pattern", []))
+        if pattern_items:
+            pattern_list.insert(tk.END, *pattern_items)
 
         btns = ttk.Frame(form)
         btns.grid(row=3, column=2, padx=10)
 
+        def refresh_pattern(select=None):
+            # 以 pattern_items 为准整体重建列表，只需一次删除和一次插入
+            pattern_list.delete(0, tk.END)
+            if pattern_items:
+                pattern_list.insert(tk.END, *pattern_items)
+            if select is not None:
+                pattern_list.selection_set(select)
+
         def add_to_pattern():
             sel = available_list.curselection()
             if not sel:
                 return
-            value = available_list.get(sel[0])
-            pattern_list.insert(tk.END, value)
+            pattern_items.append(available_list.get(sel[0]))
+            refresh_pattern()
 
         def remove_from_pattern():
             sel = pattern_list.curselection()
             if not sel:
                 return
-            pattern_list.delete(sel[0])
+            del pattern_items[sel[0]]
+            refresh_pattern()
 
         def move_up():
             sel = pattern_list.curselection()
             if not sel or sel[0] == 0:
                 return
             idx = sel[0]
-            value = pattern_list.get(idx)
-            pattern_list.delete(idx)
-            pattern_list.insert(idx - 1, value)
-            pattern_list.selection_set(idx - 1)
+            pattern_items[idx - 1], pattern_items[idx] = pattern_items[idx], pattern_items[idx - 1]
+            refresh_pattern(idx - 1)
 
         def move_down():
             sel = pattern_list.curselection()
-            if not sel or sel[0] == pattern_list.size() - 1:
+            if not sel or sel[0] == len(pattern_items) - 1:
                 return
             idx = sel[0]
-            value = pattern_list.get(idx)
-            pattern_list.delete(idx)
-            pattern_list.insert(idx + 1, value)
-            pattern_list.selection_set(idx + 1)
+            pattern_items[idx + 1], pattern_items[idx] = pattern_items[idx], pattern_items[idx + 1]
+            refresh_pattern(idx + 1)
 
         ttk.Button(btns, text=">>", command=add_to_pattern).grid(row=0, column=0, pady=2)
         ttk.Button(btns, text="<<", command=remove_from_pattern).grid(row=1, column=0, pady=2)
@@ -7962,14 +8743,14 @@ Enter     - 编辑选中项目
         action.grid(row=1, column=0, sticky=tk.EW)
 
         def on_save():
-            new_name = name_var.get().strip()
+            new_name = name_entry.get().strip()
             if not new_name:
                 messagebox.showwarning("警告", "请输入人员名称")
                 return
             if new_name != name and new_name in self.shift_schedules:
                 messagebox.showwarning("警告", "该人员名称已存在")
                 return
-            new_pattern = [pattern_list.get(i) for i in range(pattern_list.size())]
+            new_pattern = list(pattern_items)
             if not new_pattern:
                 messagebox.showwarning("警告", "请至少添加一个班次到轮班模式")
                 return
@@ -7990,17 +8771,11 @@ Enter     - 编辑选中项目
 
             if regenerate:
                 # 直接复用生成逻辑
-                shifts_map = {}
                 try:
                     sd = datetime.datetime.strptime(new_start, "%Y-%m-%d").date()
                 except Exception:
                     sd = datetime.date.today()
-                total_days = 365
-                for i in range(total_days):
-                    d = sd + datetime.timedelta(days=i)
-                    pattern_idx = i % len(new_pattern)
-                    shifts_map[d.strftime("%Y-%m-%d")] = new_pattern[pattern_idx]
-                updated["shifts"] = shifts_map
+                updated["shifts"] = _build_shifts_map(sd, new_pattern, 365)
             else:
                 # 不重算则保留原有shifts（若核心变更则清空，避免误差）
                 if changed_core:
@@ -8014,15 +8789,16 @@ Enter     - 编辑选中项目
                 self.shift_schedules[new_name] = updated
             else:
                 self.shift_schedules[name] = updated
+            self._invalidate_plan_cache()
 
-            # 同步当前计划
-            if self.current_schedule is info or (self.current_schedule and self.current_schedule == info):
+            # 同步当前计划：按名称/对象身份判断，避免对含大量 shifts 的字典做深比较
+            if self.current_plan_name == name or self.current_schedule is info:
                 self.current_schedule = updated
                 self.current_plan_name = new_name
 
             self.update_schedule_tree()
             self.update_leave_plan_combo()
-            self.save_data()
+            self._schedule_save()
             self.update_calendar()
             self.update_status(f"已保存人员: {new_name}")
             dialog.destroy()
@@ -8051,6 +8827,7 @@ Enter     - 编辑选中项目
                 self.update_schedule_tree()
                 return
             del self.shift_schedules[name]
+            self._invalidate_plan_cache()
             if self.current_schedule and self.current_schedule is not None:
                 # 如果当前计划被删除，清空当前计划
                 selected_name = name
@@ -8062,7 +8839,7 @@ Enter     - 编辑选中项目
                     self.current_plan_name = None
             self.update_schedule_tree()
             self.update_leave_plan_combo()
-            self.save_data()
+            self._schedule_save()
             self.update_status(f"已删除人员: {name}")
     
     def generate_schedule(self):
@@ -8090,19 +8867,14 @@ Enter     - 编辑选中项目
             return
 
         # 生成从开始日期起一年的排班映射
-        shifts_map = {}
-        total_days = 1825
-        for i in range(total_days):
-            d = start_date + datetime.timedelta(days=i)
-            pattern_idx = i % len(pattern)
-            shifts_map[d.strftime("%Y-%m-%d")] = pattern[pattern_idx]
+        shifts_map = _build_shifts_map(start_date, pattern, 1825)
 
         # 保存到计划并设为当前计划
         info["shifts"] = shifts_map
         self.shift_schedules[name] = info
         self.current_schedule = info
         self.current_plan_name = name
-        self.save_data()
+        self._schedule_save()
         self.update_calendar()
         self.update_year_options()
         self.sync_year_combo()
@@ -8135,7 +8907,11 @@ Enter     - 编辑选中项目
     def update_leave_plan_combo(self):
         """同步请假页计划下拉选项"""
         if hasattr(self, "leave_plan_combo"):
-            plan_names = list(self.shift_schedules.keys())
+            plan_names = self._get_plan_names()
+            # 人员列表未变化时跳过下拉框配置
+            if plan_names == self._last_leave_plan_names:
+                return
+            self._last_leave_plan_names = plan_names
             self.leave_plan_combo["values"] = plan_names
             # 若当前值不在新列表中，则回退到第一个或空
             current = self.leave_plan_var.get() if hasattr(self, "leave_plan_var") else ""
@@ -8149,140 +8925,138 @@ Enter     - 编辑选中项目
         if not hasattr(self, 'calendar_container'):
             return
 
-        # 使用临时禁用更新机制，减少GUI更新次数
-        for widget in self.calendar_container.winfo_children():
-            widget.destroy()
-        
+        # 更新期间先把容器从布局中摘下，避免每次 grid()/pack() 都触发几何重算
+        with self._unpacked(self.calendar_container):
+            self._populate_calendar()
+
+    def _populate_calendar(self):
+        """按当前月份配置日历容器中的人员信息和日期格子
+
+        格子控件只在首次调用（或容器被重建）时创建，之后翻月仅修改文字、颜色和子标签的显示。
+        """
+        container = self.calendar_container
+        if self._calendar_cells_owner is not container:
+            self._build_calendar_cells(container)
+        self._hide_calendar_tip()
+
         year, month = self.current_date.year, self.current_date.month
         self.month_year_var.set(f"{year}年{month}月")
         
-        # 获取今天的日期用于高亮显示
+        # 获取今天的日期用于高亮显示：今天不在本月时为 0
         today = datetime.date.today()
+        today_day = today.day if (today.year, today.month) == (year, month) else 0
+        self._calendar_shown = (year, month)
+        self._calendar_today = today
+        day_cells = self._calendar_day_cells = {}
         
         # 在年月标题下方显示当前人员名称
-        person_info_frame = ttk.Frame(self.calendar_container)
-        person_info_frame.grid(row=0, column=0, columnspan=7, sticky=tk.EW, pady=(0, 3))  # 减少下边距
-
         if self.current_plan_name:
-            person_label = ttk.Label(person_info_frame, text=f"当前人员: {self.current_plan_name}",
-                                   font=("Arial", 11, "bold"), foreground="#0066CC")  # 稍微减小字体
-            person_label.pack()
+            self._calendar_person_label.config(text=f"当前人员: {self.current_plan_name}",
+                                               foreground="#0066CC")
         else:
-            no_person_label = ttk.Label(person_info_frame, text="未选择人员",
-                                     font=("Arial", 11, "bold"), foreground="#FF6666")  # 稍微减小字体
-            no_person_label.pack()
+            self._calendar_person_label.config(text="未选择人员", foreground="#FF6666")
 
-        # 星期标题
-        weekdays = ["周一", "周二", "周三", "周四", "周五", "周六", "周日"]
-        for col, day in enumerate(weekdays):
-            ttk.Label(self.calendar_container, text=day).grid(row=1, column=col, sticky=tk.NSEW, padx=1, pady=0)  # 减少垂直间距
-        
         # 日期格子
-        first_day, num_days = calendar.monthrange(year, month)
+        # 循环不变量提前绑定为局部变量，避免每个格子重复查找属性
+        shift_types = self.shift_types
+        holidays_year = self._get_year_holidays(year) if self.show_holidays.get() else {}
+        show_l = self.show_leaves.get()
+        cur_plan = self.current_plan_name
+        cur_sched = self.current_schedule
+        shifts_dict = cur_sched["shifts"] if cur_sched else {}
+        leave_index = self._get_leave_index() if show_l and cur_plan else {}
+        first_day, num_days = _monthrange(year, month)
+        # 日期字符串前缀每月只格式化一次，格子内只做拼接
+        ym_prefix = f"{year}-{month:02d}-"
+        md_prefix = f"{month:02d}-"
+        day_strs = _DAY_STRS
         day_num = 1
-        for row in range(2, 8):  # 从第2行开始，因为第0行是人员信息，第1行是星期标题
-            for col in range(7):
-                if (row == 2 and col < first_day) or day_num > num_days:
+        for row, cells in enumerate(self._calendar_cells):
+            for col, cell in enumerate(cells):
+                if (row == 0 and col < first_day) or day_num > num_days:
+                    cell.hide()
                     continue
                 
-                date_str = f"{year}-{month:02d}-{day_num:02d}"
-                date_key = f"{month:02d}-{day_num:02d}"
-                current_date = datetime.date(year, month, day_num)
-                
-                # 判断是否为今天
-                is_today = current_date == today
-
-                # 周末底色（周六日轻微灰蓝，以增强可读性）
-                is_weekend = current_date.weekday() >= 5
-                cell_bg = "#F2F6FC" if is_weekend else "#FFFFFF"
-                border_color = "#0066CC" if is_today else "#CCCCCC"
-                
-                # 统一使用 tk.Frame 以便自定义背景色
-                frame = tk.Frame(self.calendar_container,
-                                 relief=tk.RIDGE,
-                                 borderwidth=2 if is_today else 1,
-                                 bg="#E6F3FF" if is_today else cell_bg,
-                                 highlightbackground=border_color,
-                                 highlightthickness=2 if is_today else 1)
-                
-                frame.grid(row=row, column=col, sticky=tk.NSEW, padx=1, pady=1)  # 减少间距
-                
-                # 显示日期 - 今天使用特殊样式
-                if is_today:
-                    # 今天的日期使用粗体、蓝色文字和特殊背景
-                    label = tk.Label(frame, text=str(day_num), font=("Arial", 10, "bold"), 
-                                   fg="#0066CC", bg="#E6F3FF")
-                    # 添加"今日"标识
-                    today_label = tk.Label(frame, text="今日", font=("Arial", 8, "bold"), 
-                                         fg="#FFFFFF", bg="#0066CC")
-                    today_label.pack(anchor=tk.NE, padx=2, pady=1)
-                else:
-                    # 普通日期的标准样式
-                    label = tk.Label(frame, text=str(day_num), bg=cell_bg)
-                
-                label.pack(anchor=tk.NW, padx=4, pady=2)
-                
-                # 预先计算可能用到的数据 - 优化性能
-                holiday = self.holidays.get(str(year), {}).get(date_key)
-                
-                # 标记节假日（重要节假日突出显示）
-                if self.show_holidays.get() and holiday:
-                    if is_today:
-                        label.config(foreground="#CC0000", font=("Arial", 10, "bold"))
-                        holiday_label = tk.Label(frame, text=f"今日·{holiday}", 
-                                              font=("Arial", 8, "bold"), 
-                                              fg="#FFFFFF", bg="#FF4444")
-                        holiday_label.pack(fill=tk.X, padx=2, pady=(2, 2))
-                        _SimpleTooltip(holiday_label, f"节假日: {holiday}")
-                    else:
-                        label.config(foreground="red")
-                        h_lbl = tk.Label(frame, text=holiday, bg="#FF6666", fg="#FFFFFF")
-                        h_lbl.pack(fill=tk.X, padx=2, pady=(2, 2))
-                        _SimpleTooltip(h_lbl, f"节假日: {holiday}")
-                
-                # 显示排班
-                shift = None
-                if self.current_schedule:
-                    shift = self.current_schedule["shifts"].get(date_str)
+                day_str = day_strs[day_num]
+                date_str = ym_prefix + day_str
+                date_key = md_prefix + day_str
                 
-                if shift and (shift_info := self.shift_types.get(shift)):
-                    # 今天的排班使用更醒目的样式
-                    if is_today:
-                        shift_label = tk.Label(frame, text=shift, 
-                                             background=shift_info["color"], 
-                                             font=("Arial", 9, "bold"),
-                                             fg="#000000" if shift_info["color"] != "#000000" else "#FFFFFF")
-                    else:
-                        shift_label = tk.Label(frame, text=shift, background=shift_info["color"])
-                    shift_label.pack(fill=tk.BOTH, expand=True, padx=4, pady=4)
-                    # 悬浮提示显示班次时间
-                    st = shift_info.get("start_time", "")
-                    et = shift_info.get("end_time", "")
-                    tip = f"{shift}  时间: {st} - {et}".strip()
-                    _SimpleTooltip(shift_label, tip)
-
-                # 减少查找请假记录的次数 - 使用预计算的字典
-                if self.show_leaves.get() and self.current_plan_name:
-                    # 构建当天请假记录的快速查找
-                    daily_leave = None
-                    for rec in self.leave_records:
-                        if (rec.get("plan_name") == self.current_plan_name and 
-                            rec.get("date") == date_str):
-                            daily_leave = rec.get("type", "请假")
-                            break
-
-                    if daily_leave:
-                        # 今天的请假使用更醒目的样式
-                        if is_today:
-                            lbl = tk.Label(frame, text=f"今日·{daily_leave}", 
-                                        bg="#FF0000", fg="#FFFFFF", 
-                                        font=("Arial", 8, "bold"))
-                        else:
-                            lbl = tk.Label(frame, text=daily_leave, bg="#FF0000", fg="#FFFFFF")
-                        lbl.pack(fill=tk.X, padx=4, pady=(0, 4))
-                        _SimpleTooltip(lbl, f"请假: {daily_leave}")
+                shift = shifts_dict.get(date_str)
+                # 列从周一开始，第5、6列即周六日
+                cell.configure(day_num,
+                               is_today=day_num == today_day,
+                               is_weekend=col >= 5,
+                               holiday=holidays_year.get(date_key),
+                               shift=shift,
+                               shift_info=shift_types.get(shift) if shift else None,
+                               leave=leave_index.get((cur_plan, date_str)))
+                day_cells[day_num] = cell
                 
                 day_num += 1
+
+    def _tick_today(self):
+        """每分钟检查日期是否变化；跨日时只更新新旧"今日"两个格子，不重建整月"""
+        self.root.after(60000, self._tick_today)
+        today = datetime.date.today()
+        old_today = self._calendar_today
+        if old_today is None or today == old_today:
+            return
+        self._calendar_today = today
+        for day, is_today in ((old_today, False), (today, True)):
+            if (day.year, day.month) == self._calendar_shown:
+                cell = self._calendar_day_cells.get(day.day)
+                if cell is not None and cell.content is not None:
+                    cell.set_today(is_today)
+
+    def _build_calendar_cells(self, container):
+        """在日历容器中一次性创建人员信息行、星期标题和 6x7 日期格子"""
+        for widget in container.winfo_children():
+            widget.destroy()
+
+        person_info_frame = ttk.Frame(container)
+        person_info_frame.grid(row=0, column=0, columnspan=7, sticky=tk.EW, pady=(0, 3))  # 减少下边距
+        self._calendar_person_label = ttk.Label(person_info_frame, font=("Arial", 11, "bold"))  # 稍微减小字体
+        self._calendar_person_label.pack()
+
+        # 星期标题
+        weekdays = ["周一", "周二", "周三", "周四", "周五", "周六", "周日"]
+        for col, day in enumerate(weekdays):
+            ttk.Label(container, text=day).grid(row=1, column=col, sticky=tk.NSEW, padx=1, pady=0)  # 减少垂直间距
+
+        # 从第2行开始，因为第0行是人员信息，第1行是星期标题
+        self._calendar_cells = [[_CalendarCell(container, row, col) for col in range(7)]
+                                for row in range(2, 8)]
+        self._calendar_cells_owner = container
+        # 所有格子共用一组悬浮提示事件处理
+        container.bind_class(_CalendarCell.CALENDAR_TIP_TAG, "<Enter>", self._show_calendar_tip)
+        container.bind_class(_CalendarCell.CALENDAR_TIP_TAG, "<Leave>", self._hide_calendar_tip)
+
+    def _show_calendar_tip(self, event):
+        """在日历格子子标签附近显示悬浮提示，复用同一个提示窗口"""
+        text = getattr(event.widget, "tooltip_text", "")
+        if not text:
+            return
+        if self._calendar_tip is None or not self._calendar_tip.winfo_exists():
+            self._calendar_tip = tk.Toplevel(self.root)
+            self._calendar_tip.wm_overrideredirect(True)
+            self._calendar_tip_label = tk.Label(self._calendar_tip, justify=tk.LEFT,
+                                                background="#FFFFE0", relief=tk.SOLID, borderwidth=1,
+                                                font=("Arial", 9))
+            self._calendar_tip_label.pack(ipadx=6, ipady=3)
+        self._calendar_tip_label.config(text=text)
+        x = event.widget.winfo_rootx() + 20
+        y = event.widget.winfo_rooty() + 20
+        self._calendar_tip.wm_geometry(f"+{x}+{y}")
+        self._calendar_tip.deiconify()
+        self._calendar_tip.lift()
+
+    def _hide_calendar_tip(self, _event=None):
+        """隐藏日历悬浮提示窗口"""
+        if self._calendar_tip is not None:
+            try:
+                self._calendar_tip.withdraw()
+            except tk.TclError:
+                self._calendar_tip = None
     
     def prev_month(self):
         """显示上个月"""
@@ -8290,8 +9064,7 @@ Enter     - 编辑选中项目
         month = self.current_date.month
         self.current_date = datetime.date(year - (month==1), 12 if month==1 else month-1, 1)
         self.update_calendar()
-        self.sync_year_combo()
-        self.sync_month_combo()
+        self._sync_year_month()
     
     def next_month(self):
         """显示下个月"""
@@ -8299,23 +9072,20 @@ Enter     - 编辑选中项目
         month = self.current_date.month
         self.current_date = datetime.date(year + (month==12), 1 if month==12 else month+1, 1)
         self.update_calendar()
-        self.sync_year_combo()
-        self.sync_month_combo()
+        self._sync_year_month()
     
     def show_current_month(self):
         """显示当前月份"""
         self.current_date = datetime.date.today()
         self.update_calendar()
-        self.sync_year_combo()
-        self.sync_month_combo()
+        self._sync_year_month()
     
     def go_to_today(self):
         """跳转到今日并高亮显示"""
         today = datetime.date.today()
         self.current_date = today
         self.update_calendar()
-        self.sync_year_combo()
-        self.sync_month_combo()
+        self._sync_year_month()
         self.update_status(f"已跳转到今日: {today.strftime('%Y年%m月%d日')}")
     
     # 数据持久化方法
@@ -8324,14 +9094,24 @@ Enter     - 编辑选中项目
         try:
             if os.path.exists("shift_data.json"):
                 with open("shift_data.json", "r", encoding="utf-8") as f:
-                    data = json.load(f)
+                    data = orjson.loads(f.read()) if orjson else json.load(f)
                     self.shift_types = data.get("shift_types", self.shift_types)
-                    self.shift_schedules = data.get("schedules", {})
-                    self.swap_records = data.get("swap_records", {})  # 加载调换班记录
+                    self.shift_schedules = {name: _expand_schedule(info)
+                                            for name, info in data.get("schedules", {}).items()}
+                    self._invalidate_plan_cache()
+                    self._load_swap_records(data.get("swap_records", {}))  # 加载调换班记录
                     self.leave_types = data.get("leave_types", self.leave_types)
+                    self._invalidate_leave_type_cache()
                     self.leave_records = data.get("leave_records", self.leave_records)
+                    self._reindex_leave_records()
                     self.leave_quotas = data.get("leave_quotas", self.leave_quotas)
-                    self.holidays.update(data.get("holidays", {}))
+                    loaded_holidays = data.get("holidays")
+                    if isinstance(loaded_holidays, dict) and loaded_holidays:
+                        # 以文件数据为准，只补回文件中没有的默认年份，不再逐年合并到默认字典
+                        for year_key, days in self.holidays.items():
+                            loaded_holidays.setdefault(year_key, days)
+                        self.holidays = loaded_holidays
+                    self._holidays_by_year.clear()
                     # 加载字体设置
                     self.font_family.set(data.get("font_family", "Microsoft YaHei UI"))
                     self.font_size.set(data.get("font_size", 10))
@@ -8374,12 +9154,97 @@ Enter     - 编辑选中项目
         except Exception as e:
             messagebox.showerror("错误", f"加载数据失败: {str(e)}")
 
-    def save_data(self):
-        """保存数据到文件"""
+    def _run_in_background(self, func, on_done):
+        """在 I/O 线程池中执行 func，完成后在主线程调用 on_done(result, error)
+
+        Tk 控件不是线程安全的，因此由主线程定时检查任务状态，而不是从工作线程回调。
+
+        Args:
+            func: 无参数的后台任务，不能访问 Tk 控件
+            on_done: 完成回调，成功时 error 为 None，失败时 result 为 None
+        """
+        future = self._io_pool.submit(func)
+
+        def check():
+            if not future.done():
+                self.root.after(50, check)
+                return
+            error = future.exception()
+            on_done(None if error is not None else future.result(), error)
+
+        self.root.after(50, check)
+
+    def _schedule_save(self):
+        """延迟保存：短时间内的多次修改合并为一次写盘"""
+        if not self._save_pending:
+            self._save_pending = True
+            self.root.after(150, self._do_save)
+
+    def _do_save(self):
+        """执行延迟保存：在主线程生成快照，交给后台线程写盘；若期间已直接保存过则跳过"""
+        self._report_save_error()
+        if not self._save_pending:
+            return
+        self._save_pending = False
+        data_bytes = self._serialize_save_data()
+        with self._save_lock:
+            # 只保留最新的快照（带序号），后台线程每次写入时取走
+            self._save_seq += 1
+            self._save_payload = (self._save_seq, data_bytes)
+            if self._save_thread is None:
+                self._save_thread = threading.Thread(target=self._save_worker, daemon=True)
+                self._save_thread.start()
+
+    def _report_save_error(self):
+        """在主线程提示后台写盘线程记录的失败（如有）"""
+        with self._save_lock:
+            error, self._save_error = self._save_error, None
+        if error is None:
+            return
+        self.update_status(f"自动保存失败：{error}")
+        # 写入失败时摘要未更新，下次保存会重新写入完整数据
+        messagebox.showerror("保存失败", f"自动保存数据失败，最近的修改尚未写入文件：\n{error}\n\n"
+                                        "下次保存时会重试，也可按 Ctrl+S 立即保存。")
+
+    def _save_worker(self):
+        """后台写盘线程：依次写入最新快照，直到没有待写数据"""
+        while True:
+            with self._save_lock:
+                payload = self._save_payload
+                self._save_payload = None
+                if payload is None:
+                    self._save_thread = None
+                    return
+            seq, data_bytes = payload
+            try:
+                self._write_snapshot(seq, data_bytes)
+            except Exception as e:
+                # 后台线程不能操作 Tk 控件：记录错误，由主线程在下次保存或界面刷新时提示
+                print(f"后台保存数据失败：{str(e)}")
+                with self._save_lock:
+                    self._save_error = e
+
+    def _write_snapshot(self, seq, data_bytes):
+        """写入序号为 seq 的快照；已写入更新的快照时跳过，避免旧数据覆盖新数据
+
+        内容与上次写入的完全相同时（按摘要比较）不重写文件。
+        """
+        with self._write_lock:
+            if seq <= self._written_seq:
+                return
+            digest = hashlib.blake2b(data_bytes, digest_size=16).digest()
+            if digest != self._last_save_digest:
+                self._write_data_file(data_bytes)
+                self._last_save_digest = digest
+            self._written_seq = seq
+
+    def _serialize_save_data(self):
+        """生成要写入 shift_data.json 的 UTF-8 JSON 字节串（在主线程调用，得到一致的快照）"""
         data = {
             "shift_types": self.shift_types,
-            "schedules": self.shift_schedules,
-            "swap_records": self.swap_records,  # 保存调换班记录
+            # 可由开始日期和轮班模式推算的排班不写盘，加载时再还原
+            "schedules": {name: _compact_schedule(info) for name, info in self.shift_schedules.items()},
+            "swap_records": self._swap_records_for_save(),  # 保存调换班记录
             "leave_types": self.leave_types,
             "leave_records": self.leave_records,
             "leave_quotas": self.leave_quotas,
@@ -8390,8 +9255,30 @@ Enter     - 编辑选中项目
             "theme": self.theme_var.get(),
             "minimize_to_tray": self.minimize_to_tray.get()
         }
-        with open("shift_data.json", "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        # 有 orjson 时用其 C 实现编码；否则用标准库，同样紧凑输出：不缩进、分隔符不带空格
+        if orjson is not None:
+            return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    @staticmethod
+    def _write_data_file(payload):
+        """先写临时文件再替换，避免写到一半时损坏数据文件"""
+        tmp_path = "shift_data.json.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(payload)
+        os.replace(tmp_path, "shift_data.json")
+
+    def save_data(self):
+        """立即在当前线程保存数据到文件（退出、Ctrl+S 使用）"""
+        self._save_pending = False
+        data_bytes = self._serialize_save_data()
+        with self._save_lock:
+            # 丢弃尚未写入的旧快照
+            self._save_seq += 1
+            seq = self._save_seq
+            self._save_payload = None
+        # 若后台正在写入，等待其完成后再写，保证最后写入的是最新数据
+        self._write_snapshot(seq, data_bytes)
     
     def update_status(self, message):
         """更新状态栏信息"""
@@ -8409,45 +9296,40 @@ Enter     - 编辑选中项目
         Returns:
             dict: 日历数据，格式为 {day: [leave_records]}
         """
-        calendar_data = {}
-
         # 获取指定月份的天数
-        days_in_month = calendar.monthrange(year, month)[1]
+        days_in_month = _monthrange(year, month)[1]
 
         # 初始化每一天的数据
-        for day in range(1, days_in_month + 1):
-            date_str = f"{year}-{month:02d}-{day:02d}"
-            calendar_data[day] = []
+        calendar_data = {day: [] for day in range(1, days_in_month + 1)}
 
-        # 填入请假记录
-        for record in self.leave_records:
-            try:
-                record_date = datetime.datetime.strptime(record['date'], "%Y-%m-%d")
-                if record_date.year == year and record_date.month == month:
-                    day = record_date.day
-                    member_name = record['plan_name']
-                    date_str = record['date']
-
-                    # 查询该人员当天的排班类型
-                    shift_type = None
-                    shift_color = "#E1E8ED"  # 默认颜色
-                    if member_name in self.shift_schedules:
-                        member_shifts = self.shift_schedules[member_name].get('shifts', {})
-                        if date_str in member_shifts:
-                            shift_type = member_shifts[date_str]
-                            # 获取班次颜色
-                            if shift_type in self.shift_types:
-                                shift_color = self.shift_types[shift_type].get('color', "#E1E8ED")
+        # 班次颜色与各人员排班表在循环外准备好，同一人员的多条记录不再重复查找
+        shift_color_by_type = {name: info.get('color', "#E1E8ED")
+                               for name, info in self.shift_types.items()}
+        member_shifts_cache = {}
 
-                    calendar_data[day].append({
-                        'name': member_name,
-                        'type': record['type'],
-                        'note': record.get('note', ''),
-                        'date': record['date'],
-                        'shift': shift_type,  # 排班类型
-                        'shift_color': shift_color  # 排班颜色
-                    })
-            except (ValueError, KeyError):
+        # 填入请假记录：只遍历该月的记录，日期已在索引中解析
+        for day, record in self._get_leave_by_ym().get((year, month), ()):
+            try:
+                member_name = record['plan_name']
+                date_str = record['date']
+
+                # 查询该人员当天的排班类型及颜色
+                member_shifts = member_shifts_cache.get(member_name)
+                if member_shifts is None:
+                    member_shifts = self.shift_schedules.get(member_name, {}).get('shifts', {})
+                    member_shifts_cache[member_name] = member_shifts
+                shift_type = member_shifts.get(date_str)
+                shift_color = shift_color_by_type.get(shift_type, "#E1E8ED")
+
+                calendar_data[day].append({
+                    'name': member_name,
+                    'type': record['type'],
+                    'note': record.get('note', ''),
+                    'date': date_str,
+                    'shift': shift_type,  # 排班类型
+                    'shift_color': shift_color  # 排班颜色
+                })
+            except KeyError:
                 continue
 
         return calendar_data
@@ -8458,18 +9340,21 @@ Enter     - 编辑选中项目
         Returns:
             list: 成员名称列表
         """
-        members = set()
+        if self._members_cache is None:
+            members = set()
 
-        # 从排班计划中获取成员
-        members.update(self.shift_schedules.keys())
+            # 从排班计划中获取成员
+            members.update(self.shift_schedules.keys())
 
-        # 从请假记录中获取成员
-        for record in self.leave_records:
-            if 'plan_name' in record:
-                members.add(record['plan_name'])
+            # 从请假记录中获取成员
+            for record in self.leave_records:
+                if 'plan_name' in record:
+                    members.add(record['plan_name'])
 
-        # 返回排序后的成员列表
-        return sorted(list(members))
+            self._members_cache = tuple(sorted(members))
+
+        # 返回排序后的成员列表（副本，调用方可自由修改）
+        return list(self._members_cache)
 
     def get_leave_types_for_holiday_calendar(self):
         """获取所有请假类型，用于当月休假日历筛选
@@ -8477,18 +9362,21 @@ Enter     - 编辑选中项目
         Returns:
             list: 请假类型列表
         """
-        leave_types = set()
+        if self._leave_types_cache is None:
+            leave_types = set()
 
-        # 从配置的请假类型中获取
-        leave_types.update(self.leave_types)
+            # 从配置的请假类型中获取
+            leave_types.update(self.leave_types)
 
-        # 从请假记录中获取实际使用的类型
-        for record in self.leave_records:
-            if 'type' in record:
-                leave_types.add(record['type'])
+            # 从请假记录中获取实际使用的类型
+            for record in self.leave_records:
+                if 'type' in record:
+                    leave_types.add(record['type'])
+
+            self._leave_types_cache = tuple(sorted(leave_types))
 
-        # 返回排序后的请假类型列表
-        return sorted(list(leave_types))
+        # 返回排序后的请假类型列表（副本，调用方可自由修改）
+        return list(self._leave_types_cache)
 
     def get_holiday_statistics(self, member_name=None, year=None, month=None, leave_type=None):
         """获取休假统计数据
@@ -8509,38 +9397,54 @@ Enter     - 编辑选中项目
             'records_by_member': {}
         }
 
-        for record in self.leave_records:
-            try:
+        if pd is not None:
+            # 有 pandas 时在缓存的 DataFrame 上用布尔掩码筛选，再按记录顺序计数，
+            # 结果（含 None 类型和键顺序）与下面的逐条统计一致
+            df = self._get_leave_df()
+            mask = pd.Series(True, index=df.index)
+            if member_name and member_name != "全部成员":
+                mask &= df['plan_name'] == member_name
+            if leave_type and leave_type != "全部类型":
+                mask &= df['type'] == leave_type
+            if year:
+                mask &= df['year'] == year
+            if month:
+                mask &= df['month'] == month
+            sub = df[mask]
+            by_type = Counter(sub['type'].tolist())
+            by_month = Counter(f"{y}-{m:02d}" for y, m in
+                               zip(sub['year'].tolist(), sub['month'].tolist()))
+            by_member = Counter(sub['plan_name'].tolist())
+        else:
+            by_type = Counter()
+            by_month = Counter()
+            by_member = Counter()
+            for record in self.leave_records:
                 # 筛选条件 - 确保处理None值和"全部"值
-                if member_name and member_name != "全部成员" and record.get('plan_name') != member_name:
+                record_member = record.get('plan_name', '未知')
+                if member_name and member_name != "全部成员" and record_member != member_name:
                     continue
-                if leave_type and leave_type != "全部类型" and record.get('type') != leave_type:
+                record_type = record.get('type', '未知')
+                if leave_type and leave_type != "全部类型" and record_type != leave_type:
                     continue
 
-                record_date = datetime.datetime.strptime(record['date'], "%Y-%m-%d")
-                if year and record_date.year != year:
+                ym = _leave_record_ym(record)
+                if ym is None:
                     continue
-                if month and record_date.month != month:
+                if year and ym[0] != year:
+                    continue
+                if month and ym[1] != month:
                     continue
 
-                # 如果通过所有筛选条件，则添加到统计中
-                stats['total_days'] += 1
-
-                # 按类型统计
-                record_type = record.get('type', '未知')
-                stats['records_by_type'][record_type] = stats['records_by_type'].get(record_type, 0) + 1
-
-                # 按月份统计
-                month_key = f"{record_date.year}-{record_date.month:02d}"
-                stats['records_by_month'][month_key] = stats['records_by_month'].get(month_key, 0) + 1
-
-                # 按成员统计
-                record_member = record.get('plan_name', '未知')
-                stats['records_by_member'][record_member] = stats['records_by_member'].get(record_member, 0) + 1
-
-            except (ValueError, KeyError) as e:
-                continue
+                # 如果通过所有筛选条件，则按类型、月份、成员分别计数
+                by_type[record_type] += 1
+                by_month[f"{ym[0]}-{ym[1]:02d}"] += 1
+                by_member[record_member] += 1
 
+        stats['total_days'] = sum(by_type.values())
+        stats['records_by_type'] = dict(by_type)
+        stats['records_by_month'] = dict(by_month)
+        stats['records_by_member'] = dict(by_member)
         return stats
 
     def get_leave_types_color_mapping(self):
@@ -8549,70 +9453,26 @@ Enter     - 编辑选中项目
         Returns:
             dict: 请假类型到颜色的映射
         """
-        # 默认颜色方案
-        default_colors = {
-            '年假': '#4CAF50',      # 绿色
-            '事假': '#FF9800',      # 橙色
-            '病假': '#F44336',      # 红色
-            '育儿假': '#9C27B0',    # 紫色
-            '婚假': '#E91E63',      # 粉色
-            '丧假': '#607D8B',      # 蓝灰色
-            '调休': '#00BCD4',      # 青色
-            '其他': '#9E9E9E'       # 灰色
-        }
-
-        # 获取所有实际使用的请假类型
-        all_types = self.get_leave_types_for_holiday_calendar()
-
-        # 为每种类型分配颜色
-        color_mapping = {}
-        color_index = 0
-        available_colors = [
-            '#4CAF50', '#FF9800', '#F44336', '#9C27B0', '#E91E63',
-            '#607D8B', '#00BCD4', '#795548', '#FF5722', '#3F51B5',
-            '#009688', '#CDDC39', '#8BC34A', '#FFC107', '#FFEB3B'
-        ]
-
-        for leave_type in all_types:
-            if leave_type in default_colors:
-                color_mapping[leave_type] = default_colors[leave_type]
-            else:
-                color_mapping[leave_type] = available_colors[color_index % len(available_colors)]
-                color_index += 1
+        if self._color_mapping_cache is None:
+            # 为每种实际使用的请假类型分配颜色
+            color_mapping = {}
+            color_index = 0
+            for leave_type in self.get_leave_types_for_holiday_calendar():
+                if leave_type in _LEAVE_TYPE_DEFAULT_COLORS:
+                    color_mapping[leave_type] = _LEAVE_TYPE_DEFAULT_COLORS[leave_type]
+                else:
+                    color_mapping[leave_type] = _LEAVE_TYPE_CYCLE_COLORS[
+                        color_index % len(_LEAVE_TYPE_CYCLE_COLORS)]
+                    color_index += 1
+            self._color_mapping_cache = color_mapping
 
-        return color_mapping
+        # 返回副本，调用方可自由修改
+        return dict(self._color_mapping_cache)
 
     def update_quota_year_options(self):
         """更新配额年份选择下拉框的选项"""
         try:
-            years = set()
-
-            # 获取请假记录中的所有年份，并按照年休假规则转换
-            for rec in self.leave_records:
-                date_str = rec.get("date", "")
-                leave_type = rec.get("type", "")
-                if not date_str:
-                    continue
-
-                try:
-                    parts = date_str.split('-')
-                    record_year = int(parts[0])
-                    record_month = int(parts[1])
-
-                    # 根据年休假规则确定配额年份
-                    if self._is_annual_leave(leave_type):
-                        # 年休假：4-12月属于当年配额，1-3月属于上年配额
-                        if record_month >= 4:
-                            quota_year = record_year
-                        else:
-                            quota_year = record_year - 1
-                    else:
-                        # 其他假期类型使用自然年
-                        quota_year = record_year
-
-                    years.add(quota_year)
-                except Exception:
-                    continue
+            years = set(self._get_leave_quota_years())
 
             # 获取配额数据中的所有年份
             for plan, plan_quotas in self.leave_quotas.items():
@@ -8623,11 +9483,7 @@ Enter     - 编辑选中项目
                         continue
 
             # 添加当前年份前后的年份作为选项
-            current_date = datetime.date.today()
-            if current_date.month >= 4:
-                default_leave_year = current_date.year
-            else:
-                default_leave_year = current_date.year - 1
+            default_leave_year = self._current_leave_year()
 
             # 添加当前年份前后3年的选项
             for y in range(default_leave_year - 3, default_leave_year + 4):
@@ -8671,17 +9527,9 @@ Enter     - 编辑选中项目
             if not hasattr(self, 'quota_year_var') or not hasattr(self, 'current_leave_year_label'):
                 return
 
-            current_date = datetime.date.today()
-
             # 确定当前年休假年度
-            if current_date.month >= 4:
-                # 4-12月：属于当前年份的年休假年度
-                leave_year = current_date.year
-                period = f"{leave_year}年4月 - {leave_year+1}年3月"
-            else:
-                # 1-3月：属于上一年的年休假年度
-                leave_year = current_date.year - 1
-                period = f"{leave_year}年4月 - {leave_year+1}年3月"
+            leave_year = self._current_leave_year()
+            period = f"{leave_year}年4月 - {leave_year+1}年3月"
 
             # 获取选择的年份
             selected_year = self.quota_year_var.get()
@@ -8745,8 +9593,9 @@ Enter     - 编辑选中项目
         frm.grid(row=0, column=0, sticky=tk.NSEW)
 
         ttk.Label(frm, text="人员名称").grid(row=0, column=0, sticky=tk.W, pady=4)
-        plan_var = tk.StringVar(value=plan if plan else (list(self.shift_schedules.keys())[0] if self.shift_schedules else ""))
-        plan_combo = ttk.Combobox(frm, textvariable=plan_var, values=list(self.shift_schedules.keys()), state="readonly", width=18)
+        plan_names = self._get_plan_names()
+        plan_var = tk.StringVar(value=plan if plan else (plan_names[0] if plan_names else ""))
+        plan_combo = ttk.Combobox(frm, textvariable=plan_var, values=plan_names, state="readonly", width=18)
         plan_combo.grid(row=0, column=1, sticky=tk.W)
 
         ttk.Label(frm, text="类型").grid(row=1, column=0, sticky=tk.W, pady=4)
@@ -8791,14 +9640,14 @@ Enter     - 编辑选中项目
                 messagebox.showwarning("警告", "年份格式错误")
                 return
 
-            # 检查上一年是否有配额数据
-            has_last_year_data = False
-            for plan_name in self.shift_schedules.keys():
-                if last_year in self.leave_quotas.get(plan_name, {}):
-                    has_last_year_data = True
-                    break
+            # 一次遍历收集有上一年配额的人员，同时用于检查与复制
+            sources = []
+            for plan_name in self.shift_schedules:
+                last_year_quotas = self.leave_quotas.get(plan_name, {}).get(last_year)
+                if last_year_quotas:
+                    sources.append((plan_name, last_year_quotas))
 
-            if not has_last_year_data:
+            if not sources:
                 messagebox.showinfo("提示", f"{last_year}年没有配额数据可复制")
                 return
 
@@ -8806,23 +9655,17 @@ Enter     - 编辑选中项目
             if not messagebox.askyesno("确认", f"确定要将{last_year}年的配额复制到{sel_year}年吗？\n这将覆盖{sel_year}年已有的配额设置。"):
                 return
 
-            # 复制上一年配额到当前年份
-            copied_count = 0
-            for plan_name in self.shift_schedules.keys():
-                last_year_quotas = self.leave_quotas.get(plan_name, {}).get(last_year, {})
-                if last_year_quotas:
-                    self.leave_quotas.setdefault(plan_name, {}).setdefault(sel_year, {}).update(last_year_quotas.copy())
-                    copied_count += 1
+            # 复制上一年配额到当前年份（配额值为数字，update 直接读取源字典即可）
+            for plan_name, last_year_quotas in sources:
+                self.leave_quotas.setdefault(plan_name, {}).setdefault(sel_year, {}).update(last_year_quotas)
+            copied_count = len(sources)
 
-            if copied_count > 0:
-                self.save_data()
-                self.update_quota_summary()
-                # 更新当前显示的配额
-                update_quota_display()
-                messagebox.showinfo("成功", f"已将{last_year}年的配额复制到{sel_year}年\n共更新{copied_count}个人员的配额")
-                self.update_status(f"已复制{last_year}年配额到{sel_year}年")
-            else:
-                messagebox.showinfo("提示", "没有找到可复制的配额数据")
+            self._schedule_save()
+            self.update_quota_summary()
+            # 更新当前显示的配额
+            update_quota_display()
+            messagebox.showinfo("成功", f"已将{last_year}年的配额复制到{sel_year}年\n共更新{copied_count}个人员的配额")
+            self.update_status(f"已复制{last_year}年配额到{sel_year}年")
 
         # 为下拉框绑定事件，当选择改变时更新配额显示
         plan_combo.bind('<<ComboboxSelected>>', lambda e: update_quota_display())
@@ -8846,7 +9689,7 @@ Enter     - 编辑选中项目
                 messagebox.showwarning("警告", "请完整选择计划、类型与年份")
                 return
             self.leave_quotas.setdefault(sel_plan, {}).setdefault(sel_year, {})[sel_type] = max(q, 0)
-            self.save_data()
+            self._schedule_save()
             self.update_quota_summary()
             self.update_status(f"已更新配额: {sel_plan} {sel_year} {sel_type} = {q}")
             top.destroy()
@@ -8871,50 +9714,61 @@ Enter     - 编辑选中项目
         # 选择文件
         file_path = filedialog.askopenfilename(
             title="选择Excel文件",
-            filetypes=[("Excel文件", "*.xlsx"), ("所有文件", "*.*")]
+            filetypes=[("Excel文件", "*.xlsx"), ("CSV文件", "*.csv"), ("所有文件", "*.*")]
         )
 
         if not file_path:
             return
 
-        try:
-            # 读取Excel文件
-            df = pd.read_excel(file_path)
+        # 在后台线程读取文件，读完后回到主线程校验并导入
+        self.update_status("正在读取导入文件...")
+        self._run_in_background(lambda: _read_leave_table(file_path), self._import_leave_table)
+
+    def _import_leave_table(self, df, error):
+        """校验读取到的导入表格并写入请假记录（在主线程执行）
 
+        Args:
+            df: _read_leave_table 读取的表格
+            error: 读取失败时的异常，成功时为 None
+        """
+        if error is not None:
+            messagebox.showerror("导入失败", f"导入过程中发生错误：\n{str(error)}")
+            return
+
+        try:
             # 验证列结构
             required_columns = ['员工姓名', '请假日期', '请假类型', '备注']
             if not all(col in df.columns for col in required_columns):
                 messagebox.showerror("错误", f"文件格式错误，需要包含以下列：{', '.join(required_columns)}")
                 return
 
-            # 验证数据完整性
-            if df.isnull().any().any():
+            # 验证数据完整性（单元格按字符串读取，空单元格为空字符串）
+            if (df == "").any().any():
                 messagebox.showerror("错误", "存在空值，请确保所有字段都已填写")
                 return
 
-            # 验证日期格式
-            date_pattern = r'^\d{4}-\d{2}-\d{2}$'
-            invalid_dates = []
-            for idx, date_str in enumerate(df['请假日期']):
-                if not re.match(date_pattern, str(date_str)):
-                    invalid_dates.append(f"第{idx+2}行: {date_str}")
+            # 各列先整体转为去空白的字符串，后续校验与导入都直接使用
+            employees = df['员工姓名'].astype(str).str.strip()
+            dates = df['请假日期'].astype(str).str.strip()
+            types = df['请假类型'].astype(str).str.strip()
+            notes = df['备注'].astype(str).str.strip()
+
+            # 验证日期格式（向量化匹配，只为错误行生成提示）
+            bad_dates = ~df['请假日期'].astype(str).str.match(_DATE_RE)
+            invalid_dates = [f"第{idx+2}行: {date_str}"
+                             for idx, date_str in zip(df.index[bad_dates], df['请假日期'][bad_dates])]
 
             if invalid_dates:
                 messagebox.showerror("错误", f"日期格式错误，应为YYYY-MM-DD：\n" + "\n".join(invalid_dates))
                 return
 
             # 验证员工姓名和请假类型
-            invalid_employees = []
-            invalid_types = []
-            for idx, row in df.iterrows():
-                employee = str(row['员工姓名']).strip()
-                leave_type = str(row['请假类型']).strip()
-
-                if employee not in self.shift_schedules:
-                    invalid_employees.append(f"第{idx+2}行: {employee}")
-
-                if leave_type not in self.leave_types:
-                    invalid_types.append(f"第{idx+2}行: {leave_type}")
+            bad_employees = ~employees.isin(set(self.shift_schedules))
+            bad_types = ~types.isin(set(self.leave_types))
+            invalid_employees = [f"第{idx+2}行: {employee}"
+                                 for idx, employee in zip(df.index[bad_employees], employees[bad_employees])]
+            invalid_types = [f"第{idx+2}行: {leave_type}"
+                             for idx, leave_type in zip(df.index[bad_types], types[bad_types])]
 
             if invalid_employees:
                 messagebox.showerror("错误", f"以下员工不存在：\n" + "\n".join(invalid_employees))
@@ -8924,20 +9778,13 @@ Enter     - 编辑选中项目
                 messagebox.showerror("错误", f"以下请假类型不存在：\n" + "\n".join(invalid_types))
                 return
 
-            # 检查重复记录
-            duplicates = []
-            for idx, row in df.iterrows():
-                employee = str(row['员工姓名']).strip()
-                date_str = str(row['请假日期']).strip()
-                leave_type = str(row['请假类型']).strip()
-
-                # 检查是否已存在相同记录
-                for record in self.leave_records:
-                    if (record.get("plan_name") == employee and
-                        record.get("date") == date_str and
-                        record.get("type") == leave_type):
-                        duplicates.append(f"第{idx+2}行: {employee} {date_str} {leave_type}")
-                        break
+            rows = list(zip(df.index, employees, dates, types, notes))
+
+            # 检查重复记录：_record_index 以 (人员, 日期, 类型) 为键，O(1) 判断
+            record_index = self._record_index
+            duplicates = [f"第{idx+2}行: {employee} {date_str} {leave_type}"
+                          for idx, employee, date_str, leave_type, _ in rows
+                          if (employee, date_str, leave_type) in record_index]
 
             if duplicates:
                 result = messagebox.askyesno("重复记录",
@@ -8947,27 +9794,17 @@ Enter     - 编辑选中项目
                 if not result:
                     return
 
-            # 导入记录
+            # 导入记录：已有键集合随导入增长，同一批次内的重复行也会跳过
+            existing = set(record_index)
             imported_count = 0
             skipped_count = 0
-            for idx, row in df.iterrows():
-                employee = str(row['员工姓名']).strip()
-                date_str = str(row['请假日期']).strip()
-                leave_type = str(row['请假类型']).strip()
-                note = str(row['备注']).strip()
-
+            for _, employee, date_str, leave_type, note in rows:
                 # 检查是否重复
-                is_duplicate = False
-                for record in self.leave_records:
-                    if (record.get("plan_name") == employee and
-                        record.get("date") == date_str and
-                        record.get("type") == leave_type):
-                        is_duplicate = True
-                        break
-
-                if is_duplicate:
+                key = (employee, date_str, leave_type)
+                if key in existing:
                     skipped_count += 1
                     continue
+                existing.add(key)
 
                 # 添加记录
                 self.leave_records.append({
@@ -8978,11 +9815,11 @@ Enter     - 编辑选中项目
                 })
                 imported_count += 1
 
+            self._reindex_leave_records()
+
             # 保存数据和更新界面
-            self.save_data()
-            self.update_leave_tree()
-            self.update_leave_stats()
-            self.update_calendar()
+            self._schedule_save()
+            self._mark_ui_dirty(DIRTY_TREE | DIRTY_CAL)
 
             messagebox.showinfo("导入完成",
                 f"成功导入 {imported_count} 条记录\n" +
@@ -8994,8 +9831,8 @@ Enter     - 编辑选中项目
 
     def export_leave_records_to_excel(self):
         """导出请假记录到Excel文件"""
-        if pd is None or Workbook is None:
-            messagebox.showerror("错误", "缺少必要的库，请安装：pip install pandas openpyxl")
+        if Workbook is None:
+            messagebox.showerror("错误", "缺少必要的库，请安装：pip install openpyxl")
             return
 
         if not self.leave_records:
@@ -9012,24 +9849,21 @@ Enter     - 编辑选中项目
         if not file_path:
             return
 
-        try:
-            # 准备数据
-            data = []
-            for record in self.leave_records:
-                data.append({
-                    '员工姓名': record.get('plan_name', ''),
-                    '请假日期': record.get('date', ''),
-                    '请假类型': record.get('type', ''),
-                    '备注': record.get('note', '')
-                })
+        # 在主线程取记录快照，工作簿的生成与写盘放到后台线程，避免界面卡顿
+        rows = [[record.get('plan_name', ''), record.get('date', ''),
+                 record.get('type', ''), record.get('note', '')]
+                for record in self.leave_records]
 
-            # 创建DataFrame
-            df = pd.DataFrame(data)
+        def write_workbook():
+            # 创建只写模式的Excel工作簿：逐行写入磁盘流，不在内存中保留全部单元格
+            wb = Workbook(write_only=True)
+            ws = wb.create_sheet("请假记录")
 
-            # 创建Excel工作簿
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "请假记录"
+            # 设置列宽（只写模式下须在写入行之前设置）
+            ws.column_dimensions['A'].width = 15  # 员工姓名
+            ws.column_dimensions['B'].width = 12  # 请假日期
+            ws.column_dimensions['C'].width = 12  # 请假类型
+            ws.column_dimensions['D'].width = 40  # 备注
 
             # 设置表头样式
             header_font = Font(bold=True, color="FFFFFF")
@@ -9037,42 +9871,36 @@ Enter     - 编辑选中项目
             header_alignment = Alignment(horizontal="center", vertical="center")
 
             # 写入表头
-            headers = ['员工姓名', '请假日期', '请假类型', '备注']
-            for col_idx, header in enumerate(headers, 1):
-                cell = ws.cell(row=1, column=col_idx, value=header)
+            header_cells = []
+            for header in ['员工姓名', '请假日期', '请假类型', '备注']:
+                cell = WriteOnlyCell(ws, value=header)
                 cell.font = header_font
                 cell.fill = header_fill
                 cell.alignment = header_alignment
+                header_cells.append(cell)
+            ws.append(header_cells)
 
-            # 写入数据
-            data_font = Font(color="000000")
-            data_alignment = Alignment(horizontal="left", vertical="center")
-
-            for row_idx, row_data in enumerate(df.itertuples(index=False), 2):
-                for col_idx, value in enumerate(row_data, 1):
-                    cell = ws.cell(row=row_idx, column=col_idx, value=value)
-                    cell.font = data_font
-                    cell.alignment = data_alignment
-
-            # 设置列宽
-            ws.column_dimensions['A'].width = 15  # 员工姓名
-            ws.column_dimensions['B'].width = 12  # 请假日期
-            ws.column_dimensions['C'].width = 12  # 请假类型
-            ws.column_dimensions['D'].width = 40  # 备注
+            # 写入数据（使用默认样式）
+            for row in rows:
+                ws.append(row)
 
             # 保存文件
             wb.save(file_path)
 
-            messagebox.showinfo("导出完成", f"成功导出 {len(self.leave_records)} 条记录到：\n{file_path}")
-            self.update_status(f"已导出 {len(self.leave_records)} 条请假记录到Excel")
+        def on_done(_result, error):
+            if error is not None:
+                messagebox.showerror("导出失败", f"导出过程中发生错误：\n{str(error)}")
+                return
+            messagebox.showinfo("导出完成", f"成功导出 {len(rows)} 条记录到：\n{file_path}")
+            self.update_status(f"已导出 {len(rows)} 条请假记录到Excel")
 
-        except Exception as e:
-            messagebox.showerror("导出失败", f"导出过程中发生错误：\n{str(e)}")
+        self.update_status("正在导出请假记录...")
+        self._run_in_background(write_workbook, on_done)
 
     def download_import_template(self):
         """下载导入模板"""
-        if pd is None or Workbook is None:
-            messagebox.showerror("错误", "缺少必要的库，请安装：pip install pandas openpyxl")
+        if Workbook is None:
+            messagebox.showerror("错误", "缺少必要的库，请安装：pip install openpyxl")
             return
 
         # 选择保存路径
@@ -9086,7 +9914,10 @@ Enter     - 编辑选中项目
         if not file_path:
             return
 
-        try:
+        # 工作簿的生成与写盘放到后台线程，说明页用到的请假类型先在主线程取快照
+        leave_types = list(self.leave_types)
+
+        def write_template():
             # 创建模板数据
             template_data = [
                 {
@@ -9131,9 +9962,10 @@ Enter     - 编辑选中项目
             data_font = Font(color="000000")
             data_alignment = Alignment(horizontal="left", vertical="center")
 
-            for row_idx, row_data in enumerate(template_data, 2):
-                for col_idx, (key, value) in enumerate(row_data.items(), 1):
-                    cell = ws.cell(row=row_idx, column=col_idx, value=value)
+            for row_data in template_data:
+                ws.append(list(row_data.values()))
+            for row in ws.iter_rows(min_row=2):
+                for cell in row:
                     cell.font = data_font
                     cell.alignment = data_alignment
 
@@ -9167,7 +9999,7 @@ Enter     - 编辑选中项目
                     "   - 选择文件并按照提示完成导入",
                     "",
                     "4. 支持的请假类型：",
-                    "   " + "、".join(self.leave_types) if self.leave_types else "   请在系统中先定义请假类型"
+                    "   " + "、".join(leave_types) if leave_types else "   请在系统中先定义请假类型"
                 ]
 
                 for row_idx, instruction in enumerate(instructions, 1):
@@ -9179,26 +10011,37 @@ Enter     - 编辑选中项目
             # 保存模板文件
             wb.save(file_path)
 
+        def on_done(_result, error):
+            if error is not None:
+                messagebox.showerror("模板下载失败", f"下载模板过程中发生错误：\n{str(error)}")
+                return
             messagebox.showinfo("模板下载完成", f"导入模板已保存到：\n{file_path}")
             self.update_status("已下载请假记录导入模板")
 
-        except Exception as e:
-            messagebox.showerror("模板下载失败", f"下载模板过程中发生错误：\n{str(e)}")
+        self._run_in_background(write_template, on_done)
 
     # ==================== 调换班功能 ====================
 
     def _bind_context_menu_recursive(self, widget, member, date_str):
         """递归地为控件及其所有子控件绑定右键菜单
 
+        不为每个控件创建回调，只记录人员与日期并加上共用的 CONTEXT_MENU_TAG 绑定标签。
+
         Args:
             widget: 要绑定的控件
             member: 人员姓名
             date_str: 日期字符串 YYYY-MM-DD
         """
-        widget.bind("<Button-3>", lambda e, m=member, d=date_str: self._show_multi_calendar_context_menu(e, m, d))
+        widget.ctx_member = member
+        widget.ctx_date = date_str
+        widget.bindtags((self.CONTEXT_MENU_TAG,) + widget.bindtags())
         for child in widget.winfo_children():
             self._bind_context_menu_recursive(child, member, date_str)
 
+    def _on_context_menu_event(self, event):
+        """CONTEXT_MENU_TAG 的右键事件：按控件上记录的人员与日期显示菜单"""
+        self._show_multi_calendar_context_menu(event, event.widget.ctx_member, event.widget.ctx_date)
+
     def _show_multi_calendar_context_menu(self, event, member, date_str):
         """显示多人日历格子的右键菜单
 
@@ -9207,16 +10050,34 @@ Enter     - 编辑选中项目
             member: 人员姓名
             date_str: 日期字符串 YYYY-MM-DD
         """
-        menu = tk.Menu(self.root, tearoff=0)
-        menu.add_command(label=f"调换班 ({member})", command=lambda: self.show_swap_shift_dialog(member, date_str))
-
-        # 如果有调换记录，添加还原选项
+        # 菜单只创建一次，每次右键只更新标签和当前目标
+        menu = self._multi_calendar_menu
+        if menu is None:
+            menu = self._multi_calendar_menu = tk.Menu(self.root, tearoff=0)
+            menu.add_command(command=self._on_context_swap_shift)
+        self._context_menu_target = (member, date_str)
+        menu.entryconfigure(0, label=f"调换班 ({member})")
+
+        # 如果有调换记录，显示还原选项（分隔线与还原项按需添加或移除）
+        has_restore = menu.index(tk.END) > 0
         if self.check_swap_record(member, date_str):
-            menu.add_separator()
-            menu.add_command(label=f"还原调换班 ({member})", command=lambda: self._do_restore_swap(member, date_str))
+            if not has_restore:
+                menu.add_separator()
+                menu.add_command(command=self._on_context_restore_swap)
+            menu.entryconfigure(2, label=f"还原调换班 ({member})")
+        elif has_restore:
+            menu.delete(1, tk.END)
 
         menu.post(event.x_root, event.y_root)
 
+    def _on_context_swap_shift(self):
+        """右键菜单"调换班"：对当前目标人员和日期打开调换班对话框"""
+        self.show_swap_shift_dialog(*self._context_menu_target)
+
+    def _on_context_restore_swap(self):
+        """右键菜单"还原调换班"：还原当前目标人员和日期的调换"""
+        self._do_restore_swap(*self._context_menu_target)
+
     def _do_restore_swap(self, member, date_str):
         """执行还原调换班操作并刷新界面
 
@@ -9246,71 +10107,138 @@ Enter     - 编辑选中项目
         Returns:
             bool: 是否有调换班记录
         """
-        if date_str not in self.swap_records:
+        swap_ids = self._swap_index.get((person, date_str))
+        if not swap_ids:
             return False
 
-        for record in self.swap_records[date_str]:
-            person_a = record.get("person_a")
-            person_b = record.get("person_b")
-            date_a = record.get("date_a")
-            date_b = record.get("date_b")
-            shift_a_original = record.get("shift_a_original")
-            shift_b_original = record.get("shift_b_original")
+        # 如果没有指定班次类型，只检查人员和日期
+        if shift_type is None:
+            return True
 
-            # 如果没有指定班次类型，只检查人员和日期
-            if shift_type is None:
-                if person_a == person or person_b == person:
-                    return True
-            else:
-                # 检查该班次是否是调换来的
-                # person_a在date_b得到了shift_b_original
-                if person == person_a and date_str == date_b and shift_type == shift_b_original:
-                    return True
-                # person_b在date_a得到了shift_a_original
-                if person == person_b and date_str == date_a and shift_type == shift_a_original:
-                    return True
+        for swap_id in swap_ids:
+            record = self.swaps_by_id[swap_id]
+            # 检查该班次是否是调换来的
+            # person_a在date_b得到了shift_b_original
+            if person == record.get("person_a") and date_str == record.get("date_b") \
+                    and shift_type == record.get("shift_b_original"):
+                return True
+            # person_b在date_a得到了shift_a_original
+            if person == record.get("person_b") and date_str == record.get("date_a") \
+                    and shift_type == record.get("shift_a_original"):
+                return True
 
         return False
 
+    def _load_swap_records(self, swap_records):
+        """从文件中的 {date_str: [record, ...]} 格式载入调换班记录并重建索引
+
+        同一次调换在两个日期下各存一份，按 swap_id 只保留一条；缺少 swap_id 的旧记录按内容生成
+        稳定的 ID（两份副本得到相同 ID），缺少 timestamp 的补为空字符串（调班记录列表按 timestamp 排序）。
+        """
+        self.swaps_by_id = {}
+        self._swap_dates = {}
+        self._swaps_by_date = {}
+        self._swap_index = {}
+        # 记录每次调换出现在文件中的哪些日期键下
+        loaded = {}
+        for date_str, records in swap_records.items():
+            for record in records:
+                swap_id = record.get("swap_id")
+                if not swap_id:
+                    swap_id = record["swap_id"] = _legacy_swap_id(record)
+                record.setdefault("timestamp", "")
+                entry = loaded.setdefault(swap_id, (record, []))
+                if date_str not in entry[1]:
+                    entry[1].append(date_str)
+        for record, file_dates in loaded.values():
+            # 缺少 date_a/date_b 的旧记录沿用文件中的日期键，避免丢失其日期
+            if record.get("date_a") and record.get("date_b"):
+                self._add_swap(record)
+            else:
+                self._add_swap(record, file_dates)
+
+    def _swap_records_for_save(self):
+        """按文件格式 {date_str: [record, ...]} 生成调换班记录（每个相关日期下各一份）"""
+        swap_records = {}
+        for swap_id, record in self.swaps_by_id.items():
+            for date_str in self._swap_dates[swap_id]:
+                swap_records.setdefault(date_str, []).append(record)
+        return swap_records
+
+    def _add_swap(self, record, dates=None):
+        """加入一条调换班记录并登记到日期与 (人员, 日期) 索引
+
+        Args:
+            record: 调换记录字典（含 swap_id）
+            dates: 记录所属的日期，默认取 date_a 与 date_b
+        """
+        if dates is None:
+            date_a = record.get("date_a")
+            date_b = record.get("date_b")
+            dates = (date_a,) if date_a == date_b else (date_a, date_b)
+        swap_id = record["swap_id"]
+        self.swaps_by_id[swap_id] = record
+        self._swap_dates[swap_id] = tuple(dates)
+        persons = {record.get("person_a"), record.get("person_b")}
+        for date_str in dates:
+            self._swaps_by_date.setdefault(date_str, []).append(swap_id)
+            for person in persons:
+                self._swap_index.setdefault((person, date_str), []).append(swap_id)
+
+    def _remove_swap(self, swap_id):
+        """删除 swap_id 对应的调换班记录并从索引中移除；记录不存在时忽略"""
+        record = self.swaps_by_id.pop(swap_id, None)
+        if record is None:
+            return
+        persons = {record.get("person_a"), record.get("person_b")}
+        for date_str in self._swap_dates.pop(swap_id):
+            keys = [(self._swaps_by_date, date_str)]
+            keys.extend((self._swap_index, (person, date_str)) for person in persons)
+            for index, key in keys:
+                swap_ids = index.get(key)
+                if swap_ids is None:
+                    continue
+                swap_ids.remove(swap_id)
+                if not swap_ids:
+                    del index[key]
+
     def _add_shift(self, person, date, shift):
-        """添加班次到指定日期（支持同一天多个班次）"""
-        if "shifts" not in self.shift_schedules[person]:
-            self.shift_schedules[person]["shifts"] = {}
+        """添加班次到指定日期（支持同一天多个班次）
 
-        current = self.shift_schedules[person]["shifts"].get(date)
+        单个班次存为字符串，多个班次存为按添加顺序排列的列表（首个班次用于显示）。
+        """
+        shifts = self.shift_schedules[person].setdefault("shifts", {})
+        current = shifts.get(date)
         if current is None:
             # 没有班次，直接设置
-            self.shift_schedules[person]["shifts"][date] = shift
+            shifts[date] = shift
         elif isinstance(current, list):
-            # 已经是列表，添加到列表
+            # 已经是列表，添加到列表（同一天最多几个班次，线性查找即可）
             if shift not in current:
                 current.append(shift)
-        else:
+        elif current != shift:
             # 是单个班次，转换为列表
-            if current != shift:
-                self.shift_schedules[person]["shifts"][date] = [current, shift]
+            shifts[date] = [current, shift]
 
     def _remove_shift(self, person, date, shift):
         """从指定日期删除班次"""
-        if "shifts" not in self.shift_schedules[person]:
+        shifts = self.shift_schedules[person].get("shifts")
+        if not shifts:
             return
 
-        current = self.shift_schedules[person]["shifts"].get(date)
-        if current is None:
-            return
-        elif isinstance(current, list):
+        current = shifts.get(date)
+        if isinstance(current, list):
             # 是列表，删除指定班次
             if shift in current:
                 current.remove(shift)
                 # 如果列表只剩一个元素，转换回字符串
                 if len(current) == 1:
-                    self.shift_schedules[person]["shifts"][date] = current[0]
-                elif len(current) == 0:
-                    del self.shift_schedules[person]["shifts"][date]
-        else:
+                    shifts[date] = current[0]
+                elif not current:
+                    del shifts[date]
+        elif current is not None and current == shift:
             # 是单个班次，直接删除
-            if current == shift:
-                del self.shift_schedules[person]["shifts"][date]
+            del shifts[date]
 
     def swap_shifts(self, person_a, person_b, date_a, date_b):
         """执行调换班操作（支持跨日期调换）
@@ -9365,34 +10293,27 @@ Enter     - 编辑选中项目
             self._add_shift(person_b, date_a, shift_a)
 
         # 记录调换（保存原始班次信息以便还原）
-        # 使用唯一ID来标识这次调换
-        swap_id = f"{person_a}_{date_a}_{person_b}_{date_b}_{datetime.datetime.now().strftime('%Y%m%d%H%M%S')}"
-
-        # 在两个日期都记录调换信息
-        for date_str in [date_a, date_b]:
-            if date_str not in self.swap_records:
-                self.swap_records[date_str] = []
-
-            timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            self.swap_records[date_str].append({
-                "swap_id": swap_id,
-                "person_a": person_a,
-                "person_b": person_b,
-                "date_a": date_a,
-                "date_b": date_b,
-                "shift_a_original": shift_a,
-                "shift_b_original": shift_b,
-                "timestamp": timestamp
-            })
+        # 使用唯一ID来标识这次调换（同一秒内的多次调换也不会重复）
+        swap_id = uuid.uuid4().hex
+        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+        self._add_swap({
+            "swap_id": swap_id,
+            "person_a": person_a,
+            "person_b": person_b,
+            "date_a": date_a,
+            "date_b": date_b,
+            "shift_a_original": shift_a,
+            "shift_b_original": shift_b,
+            "timestamp": timestamp
+        })
 
         # 保存数据
-        self.save_data()
+        self._schedule_save()
 
         # 强制清除所有缓存，确保多人日历能显示最新数据
-        if hasattr(self, '_calendar_data_cache'):
-            self._calendar_data_cache.clear()
-        if hasattr(self, '_multi_calendar_cell_cache'):
-            self._multi_calendar_cell_cache.clear()
+        self._calendar_data_cache.clear()
+        self._multi_calendar_cell_cache.clear()
 
         if date_a == date_b:
             return True, f"成功调换班次:\n{person_a}: {shift_a} → {shift_b}\n{person_b}: {shift_b} → {shift_a}"
@@ -9409,15 +10330,12 @@ Enter     - 编辑选中项目
         Returns:
             tuple: (success: bool, message: str)
         """
-        if date_str not in self.swap_records:
+        if date_str not in self._swaps_by_date:
             return False, "该日期没有调换记录"
 
         # 查找该人员的调换记录
-        swap_record = None
-        for record in self.swap_records[date_str]:
-            if record.get("person_a") == person or record.get("person_b") == person:
-                swap_record = record
-                break
+        swap_ids = self._swap_index.get((person, date_str))
+        swap_record = self.swaps_by_id[swap_ids[0]] if swap_ids else None
 
         if not swap_record:
             return False, f"{person} 在 {date_str} 没有调换记录"
@@ -9451,21 +10369,15 @@ Enter     - 编辑选中项目
             self._add_shift(person_a, date_a, shift_a_original)
             self._add_shift(person_b, date_b, shift_b_original)
 
-        # 删除两个日期的调换记录（使用 swap_id 匹配）
-        for date in [date_a, date_b]:
-            if date in self.swap_records:
-                self.swap_records[date] = [r for r in self.swap_records[date] if r.get("swap_id") != swap_id]
-                if not self.swap_records[date]:
-                    del self.swap_records[date]
+        # 删除调换记录
+        self._remove_swap(swap_id)
 
         # 保存数据
-        self.save_data()
+        self._schedule_save()
 
         # 强制清除所有缓存，确保多人日历能显示最新数据
-        if hasattr(self, '_calendar_data_cache'):
-            self._calendar_data_cache.clear()
-        if hasattr(self, '_multi_calendar_cell_cache'):
-            self._multi_calendar_cell_cache.clear()
+        self._calendar_data_cache.clear()
+        self._multi_calendar_cell_cache.clear()
 
         if date_a == date_b:
             return True, f"成功还原班次:\n{person_a}: {shift_a_original}\n{person_b}: {shift_b_original}"
@@ -9517,7 +10429,7 @@ Enter     - 编辑选中项目
         tk.Label(select_frame, text="选择人员:").pack(anchor=tk.W, pady=(0, 5))
 
         # 获取所有人员（排除当前人员）
-        all_persons = [p for p in self.shift_schedules.keys() if p != person]
+        all_persons = [p for p in self._get_plan_names() if p != person]
 
         if not all_persons:
             tk.Label(select_frame, text="没有其他人员可以调换",
@@ -9555,7 +10467,7 @@ Enter     - 编辑选中项目
         def update_target_info(*args):
             """更新目标人员的班次信息"""
             target_person = person_var.get()
-            target_date = target_date_entry.get_date().strftime("%Y-%m-%d")
+            target_date = target_date_entry.get_date().isoformat()
 
             target_shift = self.shift_schedules.get(target_person, {}).get("shifts", {}).get(target_date)
 
@@ -9581,7 +10493,7 @@ Enter     - 编辑选中项目
 
         def do_swap():
             target_person = person_var.get()
-            target_date = target_date_entry.get_date().strftime("%Y-%m-%d")
+            target_date = target_date_entry.get_date().isoformat()
 
             # 检查目标人员在目标日期是否有排班
             target_shift = self.shift_schedules.get(target_person, {}).get("shifts", {}).get(target_date)
@@ -9609,35 +10521,40 @@ Enter     - 编辑选中项目
     def refresh_swap_list(self):
         """刷新调班记录列表"""
         # 清空现有数据
-        for item in self.swap_tree.get_children():
-            self.swap_tree.delete(item)
-
-        # 收集所有唯一的调班记录
-        seen_swap_ids = set()
-        swap_records_list = []
-
-        for date_str, records in self.swap_records.items():
-            for record in records:
-                swap_id = record.get("swap_id")
-                if swap_id and swap_id not in seen_swap_ids:
-                    seen_swap_ids.add(swap_id)
-                    swap_records_list.append(record)
+        self.swap_tree.delete(*self.swap_tree.get_children())
 
         # 按时间戳排序（最新的在前）
-        swap_records_list.sort(key=lambda x: x.get("timestamp", ""), reverse=True)
-
-        # 插入数据
-        for record in swap_records_list:
-            self.swap_tree.insert("", tk.END, values=(
-                record.get("swap_id", ""),
-                record.get("person_a", ""),
-                record.get("date_a", ""),
-                record.get("shift_a_original", ""),
-                record.get("person_b", ""),
-                record.get("date_b", ""),
-                record.get("shift_b_original", ""),
-                record.get("timestamp", "")
-            ))
+        swap_records_list = sorted(self.swaps_by_id.values(),
+                                   key=itemgetter("timestamp"), reverse=True)
+
+        # 插入数据：首批立即插入，其余分批在空闲时插入
+        rows = [(
+            record.get("swap_id", ""),
+            record.get("person_a", ""),
+            record.get("date_a", ""),
+            record.get("shift_a_original", ""),
+            record.get("person_b", ""),
+            record.get("date_b", ""),
+            record.get("shift_b_original", ""),
+            record.get("timestamp", "")
+        ) for record in swap_records_list]
+        self._swap_list_fill_id += 1
+        self._fill_swap_list_chunk(rows, 0, self._swap_list_fill_id)
+
+    def _fill_swap_list_chunk(self, rows, start, fill_id):
+        """分批填充调班记录列表，每批之间让出事件循环
+
+        Args:
+            rows: 全部行的 values
+            start: 本批的起始下标
+            fill_id: 发起填充时的编号，列表再次刷新后旧的批次不再继续
+        """
+        if fill_id != self._swap_list_fill_id:
+            return
+        end = start + _SWAP_LIST_CHUNK_ROWS
+        self._treeview_fill(self.swap_tree, rows[start:end])
+        if end < len(rows):
+            self.root.after_idle(self._fill_swap_list_chunk, rows, end, fill_id)
 
     def add_swap_record(self):
         """新增调班记录"""
@@ -9662,10 +10579,13 @@ Enter     - 编辑选中项目
         frame_a = ttk.LabelFrame(main_frame, text="人员A", padding=10)
         frame_a.pack(fill=tk.X, pady=(0, 10))
 
+        # 两个人员下拉框共用同一份人员名称
+        persons = self._get_plan_names()
+
         ttk.Label(frame_a, text="选择人员:").pack(anchor=tk.W, pady=(0, 5))
         person_a_var = tk.StringVar()
         person_a_combo = ttk.Combobox(frame_a, textvariable=person_a_var,
-                                     values=list(self.shift_schedules.keys()), state="readonly")
+                                     values=persons, state="readonly")
         person_a_combo.pack(fill=tk.X, pady=(0, 10))
 
         ttk.Label(frame_a, text="选择日期:").pack(anchor=tk.W, pady=(0, 5))
@@ -9683,7 +10603,7 @@ Enter     - 编辑选中项目
         ttk.Label(frame_b, text="选择人员:").pack(anchor=tk.W, pady=(0, 5))
         person_b_var = tk.StringVar()
         person_b_combo = ttk.Combobox(frame_b, textvariable=person_b_var,
-                                     values=list(self.shift_schedules.keys()), state="readonly")
+                                     values=persons, state="readonly")
         person_b_combo.pack(fill=tk.X, pady=(0, 10))
 
         ttk.Label(frame_b, text="选择日期:").pack(anchor=tk.W, pady=(0, 5))
@@ -9696,12 +10616,12 @@ Enter     - 编辑选中项目
 
         def update_shift_info(*args):
             if person_a_var.get():
-                date_a = date_a_entry.get_date().strftime("%Y-%m-%d")
+                date_a = date_a_entry.get_date().isoformat()
                 shift_a = self.shift_schedules.get(person_a_var.get(), {}).get("shifts", {}).get(date_a, "无排班")
                 shift_a_label.config(text=f"班次: {shift_a}")
 
             if person_b_var.get():
-                date_b = date_b_entry.get_date().strftime("%Y-%m-%d")
+                date_b = date_b_entry.get_date().isoformat()
                 shift_b = self.shift_schedules.get(person_b_var.get(), {}).get("shifts", {}).get(date_b, "无排班")
                 shift_b_label.config(text=f"班次: {shift_b}")
 
@@ -9717,8 +10637,8 @@ Enter     - 编辑选中项目
         def do_add():
             person_a = person_a_var.get()
             person_b = person_b_var.get()
-            date_a = date_a_entry.get_date().strftime("%Y-%m-%d")
-            date_b = date_b_entry.get_date().strftime("%Y-%m-%d")
+            date_a = date_a_entry.get_date().isoformat()
+            date_b = date_b_entry.get_date().isoformat()
 
             if not person_a or not person_b:
                 messagebox.showerror("错误", "请选择人员")
@@ -9778,19 +10698,24 @@ Enter     - 编辑选中项目
         swap_id = values[0]
         result = messagebox.askyesno("确认", "确定要删除这条调班记录吗？\n注意：这不会还原班次，只是删除记录。")
         if result:
-            # 从所有日期中删除该swap_id的记录
-            for date_str in list(self.swap_records.keys()):
-                self.swap_records[date_str] = [r for r in self.swap_records[date_str] if r.get("swap_id") != swap_id]
-                if not self.swap_records[date_str]:
-                    del self.swap_records[date_str]
+            # 删除该swap_id的记录
+            self._remove_swap(swap_id)
 
-            self.save_data()
+            self._schedule_save()
             self.refresh_swap_list()
             messagebox.showinfo("成功", "调班记录已删除")
 
     def run(self):
         """运行主循环"""
-        self.root.mainloop()
+        try:
+            self.root.mainloop()
+        finally:
+            # 主循环非正常结束（如 Ctrl+C）时，补写尚未执行的延迟保存；
+            # 后台写盘线程是守护线程，进程退出时可能被中断，因此它有待写或正在写的快照时也同步保存一次
+            with self._save_lock:
+                background_busy = self._save_payload is not None or self._save_thread is not None
+            if self._save_pending or background_busy:
+                self.save_data()
 
 if __name__ == "__main__":
     root = tk.Tk()
@@ -0,0 +1,60 @@
+import pytest
+
+pytest.importorskip("tkcalendar")
+pytest.importorskip("lunarcalendar")
+
+import rlpb
+
+RECORDS = [
+    {"plan_name": "张三", "date": "2025-04-01", "type": "年休假"},
+    {"plan_name": "李四", "date": "2025-4-2", "type": None},
+    {"plan_name": "张三", "date": "2025-03-15", "type": "带薪病事假"},
+    {"date": "2025-04-03", "type": "年休假"},
+    {"plan_name": "张三", "date": "2025-02-30", "type": "年休假"},
+    {"plan_name": "李四", "date": None, "type": "年休假"},
+    {"plan_name": "李四", "date": "bad", "type": "年休假"},
+    {"plan_name": "张三", "date": "2025-04-05"},
+]
+
+QUERIES = [
+    {},
+    {"member_name": "张三"},
+    {"member_name": "全部成员", "leave_type": "年休假"},
+    {"year": 2025, "month": 4},
+    {"leave_type": "未知"},
+]
+
+
+def make_scheduler():
+    app = rlpb.ShiftScheduler.__new__(rlpb.ShiftScheduler)
+    app.leave_records = [dict(rec) for rec in RECORDS]
+    app._invalidate_leave_caches()
+    return app
+
+
+def ordered(stats):
+    return {key: list(value.items()) if isinstance(value, dict) else value
+            for key, value in stats.items()}
+
+
+def loop_stats(monkeypatch, **query):
+    monkeypatch.setattr(rlpb, "pd", None)
+    return ordered(make_scheduler().get_holiday_statistics(**query))
+
+
+def test_loop_statistics(monkeypatch):
+    stats = loop_stats(monkeypatch)
+    assert stats == {
+        'total_days': 5,
+        'records_by_type': [("年休假", 2), (None, 1), ("带薪病事假", 1), ("未知", 1)],
+        'records_by_month': [("2025-04", 4), ("2025-03", 1)],
+        'records_by_member': [("张三", 3), ("李四", 1), ("未知", 1)],
+    }
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_pandas_statistics_match_loop(monkeypatch, query):
+    pd = pytest.importorskip("pandas")
+    expected = loop_stats(monkeypatch, **query)
+    monkeypatch.setattr(rlpb, "pd", pd)
+    assert ordered(make_scheduler().get_holiday_statistics(**query)) == expected
@@ -0,0 +1,38 @@
+import pytest
+
+pytest.importorskip("tkcalendar")
+pytest.importorskip("lunarcalendar")
+
+import rlpb
+
+
+def make_scheduler(records):
+    """不创建窗口，只初始化请假记录相关状态"""
+    app = rlpb.ShiftScheduler.__new__(rlpb.ShiftScheduler)
+    app.leave_records = list(records)
+    app._record_index = {}
+    app._invalidate_leave_caches()
+    app._reindex_leave_records()
+    return app
+
+
+def test_reindex_tolerates_none_and_non_str_fields():
+    app = make_scheduler([
+        {"plan_name": "张三", "date": "2025-05-02", "type": "年休假"},
+        {"plan_name": None, "date": None, "type": "年休假"},
+        {"plan_name": "李四", "date": "2025-05-01", "type": "年休假"},
+        {"plan_name": 7, "date": 20250503, "type": "年休假"},
+    ])
+    dates = [rec["date"] for rec in app.leave_records]
+    assert dates == [None, "2025-05-01", "2025-05-02", 20250503]
+    assert app._record_index[("李四", "2025-05-01", "年休假")][0]["plan_name"] == "李四"
+
+
+def test_reindex_normalizes_unpadded_dates():
+    app = make_scheduler([
+        {"plan_name": "张三", "date": "2025-4-1", "type": "年休假"},
+        {"plan_name": "张三", "date": "2025-03-31", "type": "年休假"},
+    ])
+    assert [rec["date"] for rec in app.leave_records] == ["2025-03-31", "2025-04-01"]
+    assert sorted(app._get_leave_quota_years()) == [2024, 2025]
+    assert (2025, 4) in app._get_leave_by_ym()
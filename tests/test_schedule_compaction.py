@@ -0,0 +1,36 @@
+import copy
+import datetime
+
+import pytest
+
+pytest.importorskip("tkcalendar")
+pytest.importorskip("lunarcalendar")
+
+import rlpb
+
+
+def make_schedule(days=60):
+    start = datetime.date(2025, 1, 1)
+    shifts = rlpb._build_shifts_map(start, ["早", "中", "晚", "休"], days)
+    shifts["2025-01-10"] = "休"
+    del shifts["2025-01-20"]
+    return {"start_date": "2025-01-01", "shift_pattern": ["早", "中", "晚", "休"], "shifts": shifts}
+
+
+def test_compact_round_trip():
+    info = make_schedule()
+    compact = rlpb._compact_schedule(info)
+    assert "shifts" not in compact
+    assert compact["shift_overrides"] == {"2025-01-10": "休"}
+    assert compact["shift_removed"] == ["2025-01-20"]
+    assert rlpb._expand_schedule(copy.deepcopy(compact))["shifts"] == info["shifts"]
+
+
+def test_compact_reuses_expected_map():
+    rlpb._expected_shifts_map.cache_clear()
+    info = make_schedule()
+    rlpb._compact_schedule(info)
+    info["shifts"]["2025-01-11"] = "休"
+    compact = rlpb._compact_schedule(info)
+    assert rlpb._expected_shifts_map.cache_info().hits == 1
+    assert compact["shift_overrides"] == {"2025-01-10": "休", "2025-01-11": "休"}